@@ -1,35 +1,269 @@
+import re
+import socket
+import sys
+import threading
+import time
+from functools import lru_cache, partial
+from urllib.parse import urlsplit
 import requests
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
-from PyQt6.QtCore import QObject, pyqtSignal
-from typing import Dict, List, Any
+from requests.packages.urllib3.connection import HTTPConnection, HTTPSConnection
+from requests.packages.urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from requests.packages.urllib3.exceptions import ConnectTimeoutError
+from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 import logging
+import json_utils
+
+try:
+    import httpx
+    import h2  # noqa: F401 - httpx needs it for HTTP/2
+except ImportError:  # HTTP/2 is optional, requests is always available
+    httpx = None
 
 logger = logging.getLogger(__name__)
 
+# DNS cache for the requests session's connections, so repeated connections
+# to the relay host skip the resolver round-trip: {(host, port): (expires_at, [ip, ...])}
+DNS_CACHE_TTL = 300  # seconds
+_dns_cache = {}
+_dns_cache_lock = threading.Lock()
+
+def _resolve_cached(host, port):
+    """Resolve a host to a list of IP addresses, reusing recent lookups"""
+    key = (host, port)
+    now = time.monotonic()
+    with _dns_cache_lock:
+        entry = _dns_cache.get(key)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    
+    addresses = []
+    for info in socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM):
+        ip = info[4][0]
+        if ip not in addresses:
+            addresses.append(ip)
+    with _dns_cache_lock:
+        _dns_cache[key] = (now + DNS_CACHE_TTL, addresses)
+    return addresses
+
+class _CachedDNSMixin:
+    """Connects through the DNS cache; the original host name is still
+    used for the Host header, SNI and certificate checks"""
+    
+    def _new_conn(self):
+        host = self._dns_host
+        try:
+            addresses = _resolve_cached(host.strip("[]"), self.port)
+        except OSError:
+            addresses = None
+        if not addresses:
+            # Let urllib3 resolve and report failures the usual way
+            return super()._new_conn()
+        
+        last_error = None
+        try:
+            for ip in addresses:
+                self._dns_host = ip
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError as e:  # also NewConnectionError
+                    last_error = e
+        finally:
+            self._dns_host = host
+        
+        # The cached addresses may be stale, resolve again next time
+        with _dns_cache_lock:
+            _dns_cache.pop((host.strip("[]"), self.port), None)
+        raise last_error
+
+class _CachedDNSHTTPConnection(_CachedDNSMixin, HTTPConnection):
+    pass
+
+class _CachedDNSHTTPSConnection(_CachedDNSMixin, HTTPSConnection):
+    pass
+
+class _CachedDNSHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CachedDNSHTTPConnection
+
+class _CachedDNSHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedDNSHTTPSConnection
+
+class _CachedDNSAdapter(HTTPAdapter):
+    """HTTPAdapter whose direct connections resolve hosts through the DNS cache"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CachedDNSHTTPConnectionPool,
+            "https": _CachedDNSHTTPSConnectionPool,
+        }
+
+# Matches a ":variable" path segment, e.g. "/:uuid"; the name is the rest of the segment
+_PATH_VAR_RE = re.compile(r'/:([^/]+)')
+
+@lru_cache(maxsize=256)
+def path_template(path):
+    """Translate an endpoint path's :variable segments to a str.format template
+    
+    e.g. "/clients/:clientId" -> "/clients/{clientId}". Literal braces are
+    escaped so they survive formatting.
+    """
+    escaped = path.replace('{', '{{').replace('}', '}}')
+    return _PATH_VAR_RE.sub(r'/{\1}', escaped)
+
+@lru_cache(maxsize=256)
+def _resolve_path(endpoint, path_items):
+    """Substitute :variable segments in an endpoint path
+    
+    Cached per (endpoint, path params) pair, so each mapping is only
+    resolved once. path_items is a sorted tuple of (name, value) pairs.
+    Returns the path and a tuple of variable names that had no value;
+    those segments are left in place.
+    """
+    values = dict(path_items)
+    missing = []
+    
+    def substitute(match):
+        var_name = match.group(1)
+        if var_name in values:
+            return '/' + str(values[var_name])
+        missing.append(var_name)
+        return match.group(0)
+    
+    return _PATH_VAR_RE.sub(substitute, endpoint), tuple(missing)
+
+# HTTP methods a mapping's endpoint string may be prefixed with, e.g. "GET /clients"
+_METHODS = frozenset(map(sys.intern, ("GET", "POST", "PUT", "DELETE")))
+_METHOD_RE = re.compile(r'(GET|POST|PUT|DELETE) (.*)', re.DOTALL)
+
+# Header and query names sent with every call
+_API_KEY_HEADER = sys.intern('x-api-key')
+_CLIENT_ID_HEADER = sys.intern('Client-ID')
+_CLIENT_ID_PARAM = sys.intern('clientId')
+
+def split_endpoint(endpoint):
+    """Split a "METHOD /path" endpoint string into (method, path)
+    
+    Returns (None, endpoint) when the string has no method prefix.
+    """
+    match = _METHOD_RE.match(endpoint)
+    if match:
+        return sys.intern(match.group(1)), match.group(2)
+    return None, endpoint
+
+class ApiError(Exception):
+    """Raised by call_endpoint when a call fails or returns an error status
+    
+    status is the HTTP status code, or None when no usable response was
+    received; body holds the response body or a description of the failure.
+    """
+    __slots__ = ("status", "body")
+    
+    def __init__(self, status, body=b""):
+        super().__init__(status, body)
+        self.status = status
+        self.body = body
+    
+    def __str__(self):
+        if self.status is None:
+            return f"API call failed: {self.body}"
+        return f"API call failed: HTTP {self.status}"
+
+@dataclass(slots=True, frozen=True)
+class Endpoint:
+    """An API endpoint as described by /api/docs"""
+    display: str
+    method: str
+    path: str
+    description: str = ""
+    required_parameters: tuple = ()
+    optional_parameters: tuple = ()
+    template: str = ""  # path as a str.format template, see path_template()
+
+# Hosts that never need proxy/netrc lookups
+_LOOPBACK_HOSTS = frozenset(("localhost", "127.0.0.1", "::1"))
+
+# Endpoints listed in /api/docs that are never useful as MIDI targets
+_SKIPPED_DOC_PATHS = frozenset(("/api/docs", "/health", "/api/status"))
+
+# Extra header for calls whose body is pre-serialized JSON bytes
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
 class ApiClient(QObject):
     api_status_changed = pyqtSignal(bool, str)
     clients_loaded = pyqtSignal(list)
     endpoints_loaded = pyqtSignal(list)
+    endpoint_call_finished = pyqtSignal(object, bool, object)  # tag, success, response or error
+    
+    # Window in which call_endpoint_coalesced merges calls to the same endpoint
+    COALESCE_INTERVAL_MS = 15
+    # How long fetched client/endpoint lists are reused before refetching
+    RESPONSE_CACHE_TTL = 60
+    # Seconds to wait for a connection or response, with either backend
+    REQUEST_TIMEOUT = 10
     
-    def __init__(self):
+    def __init__(self, http2=False):
+        """http2 opts in to the httpx HTTP/2 backend when it is installed"""
         super().__init__()
         self.api_url = "https://foundryvtt-rest-api-relay.fly.dev"
         self.api_key = ""
         self.client_id = ""
         self.available_endpoints = []
+        # (name, url, key) -> (expiry, value) for the idempotent list fetches
+        self._response_cache = {}
+        self._parse_api_url()
+        self._base_headers = self._build_base_headers()
+        # Cached debug flag for the per-request paths, refreshed on config changes
+        self._dbg = logger.isEnabledFor(logging.DEBUG)
         
         # Create an optimized session for faster API calls
-        self.session = self._create_session()
+        self.session = self._create_session(http2)
+        
+        # Worker pool so MIDI-triggered calls overlap in flight instead of
+        # serializing on the Qt thread
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="api-call")
+        
+        # (endpoint, method, coalesced) -> callable from bind_endpoint
+        self._bound_endpoints = {}
+        
+        # Calls waiting out the coalescing window, one per distinct call
+        self._pending_calls = {}
+        self._coalesce_timer = QTimer(self)
+        self._coalesce_timer.setSingleShot(True)
+        self._coalesce_timer.setInterval(self.COALESCE_INTERVAL_MS)
+        self._coalesce_timer.timeout.connect(self._flush_pending_calls)
         
         logger.debug("API client initialized")
     
-    def _create_session(self):
-        """Create an optimized session for API calls"""
+    def _create_session(self, http2=False):
+        """Create an optimized session for API calls
+        
+        A pooled requests session by default. With http2 set (and httpx/h2
+        installed) an HTTP/2 httpx client is used instead, which multiplexes
+        concurrent calls over one connection; it is configured like the
+        requests session (same pool size and timeout, redirects followed,
+        no retries), but doesn't get the DNS cache or the local trust_env
+        shortcut.
+        """
+        if http2 and httpx is None:
+            logger.warning("HTTP/2 requested but httpx/h2 aren't installed, using requests")
+        self._http2 = http2 and httpx is not None
+        if self._http2:
+            logger.info("Using HTTP/2 client for API calls")
+            return httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+                follow_redirects=True,
+                timeout=self.REQUEST_TIMEOUT
+            )
+        
         session = requests.Session()
         
         # Configure connection pooling and keepalives
-        adapter = HTTPAdapter(
+        adapter = _CachedDNSAdapter(
             pool_connections=10,
             pool_maxsize=20,
             max_retries=Retry(
@@ -47,24 +281,81 @@ class ApiClient(QObject):
         self.api_url = url.rstrip('/')
         self.api_key = key
         self.client_id = client_id
+        self._response_cache.clear()
+        self._parse_api_url()
+        self._base_headers = self._build_base_headers()
+        self._dbg = logger.isEnabledFor(logging.DEBUG)
+        self._configure_local_shortcut()
         
         logger.info("API configuration set: URL=%s, Client ID=%s", url, client_id)
         
         # Test connection
         if url and key:
-            logger.debug("Testing API connection")
+            if self._dbg:
+                logger.debug("Testing API connection")
             self.test_connection()
     
+    def _parse_api_url(self):
+        """Split the API URL once so requests only concatenate paths"""
+        self._url_parts = urlsplit(self.api_url)
+        self._origin = f"{self._url_parts.scheme}://{self._url_parts.netloc}"
+        self._base_path = self._url_parts.path.rstrip('/')
+        self._base_url = self._origin + self._base_path
+    
+    def _configure_local_shortcut(self):
+        """Skip environment lookups when talking to a local Foundry
+        
+        requests re-reads proxy and netrc settings from the environment on
+        every call unless trust_env is off; none of that applies to a plain
+        http://localhost API, which is the common deployment.
+        """
+        if self._http2 or self.session is None:
+            return  # httpx reads the environment once when the client is built
+        parts = self._url_parts
+        is_local = parts.scheme == "http" and parts.hostname in _LOOPBACK_HOSTS
+        self.session.trust_env = not is_local
+        if is_local and self._dbg:
+            logger.debug("Local API detected, skipping proxy/netrc lookups")
+    
+    def _build_base_headers(self):
+        """Build the auth headers sent with every request
+        
+        Rebuilt only when the configuration changes; a new dict is created
+        each time so in-flight requests never see a half-updated one.
+        """
+        # Use x-api-key header instead of Authorization
+        headers = {_API_KEY_HEADER: self.api_key}
+        if self.client_id:
+            # Also include client id in header for legacy support
+            headers[_CLIENT_ID_HEADER] = self.client_id
+        return headers
+    
+    def _cached_response(self, name):
+        """Return a still-fresh cached fetch result, or None"""
+        entry = self._response_cache.get((name, self.api_url, self.api_key))
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+    
+    def _cache_response(self, name, value):
+        key = (name, self.api_url, self.api_key)
+        self._response_cache[key] = (time.monotonic() + self.RESPONSE_CACHE_TTL, value)
+    
     def test_connection(self):
         """Test API connection and fetch available endpoints"""
         try:
-            logger.debug("Making test request to API root endpoint")
+            if self._dbg:
+                logger.debug("Making test request to API root endpoint")
             response = self._make_request("GET", "/")
             if response.status_code == 200:
                 logger.info("API connection test successful")
                 self.api_status_changed.emit(True, "Connected successfully")
-                self.fetch_clients()
-                self.fetch_available_endpoints()
+                
+                # The two fetches are independent, run them side by side on
+                # the worker pool; their results arrive via clients_loaded and
+                # endpoints_loaded, so don't block the caller waiting for them
+                self._executor.submit(self.fetch_clients)
+                self._executor.submit(self.fetch_available_endpoints)
                 return True
             else:
                 logger.warning("API connection failed: Status code %d", response.status_code)
@@ -75,18 +366,30 @@ class ApiClient(QObject):
             self.api_status_changed.emit(False, str(e))
             return False
     
-    def fetch_clients(self):
-        """Fetch available clients from the API"""
+    def fetch_clients(self, force=False):
+        """Fetch available clients from the API
+        
+        A list fetched within the last RESPONSE_CACHE_TTL seconds is reused
+        unless force is set, e.g. when the user explicitly refreshes.
+        """
+        if not force:
+            clients = self._cached_response("clients")
+            if clients is not None:
+                self.clients_loaded.emit(clients)
+                return clients
         try:
-            logger.debug("Fetching clients from API")
+            if self._dbg:
+                logger.debug("Fetching clients from API")
             response = self._make_request("GET", "/clients")
             if response.status_code == 200:
-                response_data = response.json()
-                logger.debug("Clients response: %s", response_data)
+                response_data = json_utils.loads(response.content)
+                if self._dbg:
+                    logger.debug("Clients response: %s", response_data)
                 
                 if "clients" in response_data and isinstance(response_data["clients"], list):
                     clients = response_data["clients"]
                     logger.info("Successfully fetched %d clients", len(clients))
+                    self._cache_response("clients", clients)
                     self.clients_loaded.emit(clients)
                     return clients
                 else:
@@ -100,42 +403,43 @@ class ApiClient(QObject):
             self.api_status_changed.emit(False, f"Failed to fetch clients: {str(e)}")
             return []
     
-    def fetch_available_endpoints(self):
-        """Fetch available endpoints from the API documentation"""
+    def fetch_available_endpoints(self, force=False):
+        """Fetch available endpoints from the API documentation
+        
+        Cached like fetch_clients; pass force to bypass the cache.
+        """
+        if not force:
+            endpoints = self._cached_response("endpoints")
+            if endpoints is not None:
+                self.available_endpoints = endpoints
+                self.endpoints_loaded.emit(endpoints)
+                return endpoints
         try:
-            logger.debug("Fetching available endpoints from API docs")
+            if self._dbg:
+                logger.debug("Fetching available endpoints from API docs")
             response = self._make_request("GET", "/api/docs")
             if response.status_code == 200:
-                api_docs = response.json()
+                api_docs = json_utils.loads(response.content)
                 
                 if "endpoints" in api_docs and isinstance(api_docs["endpoints"], list):
-                    # Extract endpoints from the documentation
-                    endpoints = []
-                    for endpoint_info in api_docs["endpoints"]:
-                        method = endpoint_info.get("method", "")
-                        path = endpoint_info.get("path", "")
-                        description = endpoint_info.get("description", "")
-                        
-                        # Skip documentation endpoints
-                        if path in ["/api/docs", "/health", "/api/status"]:
-                            continue
-                            
-                        # Extract parameter information
-                        required_params = endpoint_info.get("requiredParameters", [])
-                        optional_params = endpoint_info.get("optionalParameters", [])
-                        
-                        # Format endpoint for display
-                        formatted_endpoint = f"{method} {path}"
-                        endpoints.append({
-                            "display": formatted_endpoint,
-                            "method": method,
-                            "path": path,
-                            "description": description,
-                            "required_parameters": required_params,
-                            "optional_parameters": optional_params
-                        })
+                    # Extract endpoints from the documentation, skipping
+                    # the documentation/health endpoints themselves
+                    endpoints = [
+                        Endpoint(
+                            display=f"{info.get('method', '')} {info.get('path', '')}",
+                            method=info.get("method", ""),
+                            path=info.get("path", ""),
+                            description=info.get("description", ""),
+                            required_parameters=tuple(info.get("requiredParameters", ())),
+                            optional_parameters=tuple(info.get("optionalParameters", ())),
+                            template=path_template(info.get("path", ""))
+                        )
+                        for info in api_docs["endpoints"]
+                        if info.get("path", "") not in _SKIPPED_DOC_PATHS
+                    ]
                     
                     self.available_endpoints = endpoints
+                    self._cache_response("endpoints", endpoints)
                     logger.info("Successfully fetched %d endpoints from API docs", len(endpoints))
                     
                     # Emit the full endpoint objects
@@ -161,81 +465,168 @@ class ApiClient(QObject):
             path_params (dict, optional): Path parameter values to substitute
             method (str, optional): HTTP method (GET, POST, PUT, DELETE)
         """
-        if not endpoint.startswith('/'):
-            endpoint = '/' + endpoint
-        
         # Determine the HTTP method
         if not method:
             # Try to extract method from endpoint string if in format "METHOD /path"
-            if " " in endpoint and endpoint.split(" ")[0] in ["GET", "POST", "PUT", "DELETE"]:
-                method, endpoint = endpoint.split(" ", 1)
-            else:
-                # Default to POST if not specified
-                method = "POST"
+            method, endpoint = split_endpoint(endpoint)
+        
+        # Default to POST if not specified or not recognised
+        method = method.upper() if method else "POST"
+        if method not in _METHODS:
+            method = "POST"
+        
+        if not endpoint.startswith('/'):
+            endpoint = '/' + endpoint
         
         # Replace path variables with actual values if provided
-        if path_params:
-            # Process path variables (replace :variable with actual value)
-            path_parts = endpoint.split('/')
-            for i, part in enumerate(path_parts):
-                if part and part.startswith(':'):
-                    var_name = part[1:]  # Remove the colon
-                    if var_name in path_params:
-                        # Replace with the actual value
-                        path_parts[i] = path_params[var_name]
-                    else:
-                        logger.warning("Missing path parameter value for %s", var_name)
+        if path_params and ':' in endpoint:
+            try:
+                endpoint, missing = _resolve_path(endpoint, tuple(sorted(path_params.items())))
+            except TypeError:
+                # Unhashable parameter values can't be cached
+                endpoint, missing = _resolve_path.__wrapped__(endpoint, tuple(path_params.items()))
+            for var_name in missing:
+                logger.warning("Missing path parameter value for %s", var_name)
             
-            # Reconstruct the endpoint path
-            endpoint = '/'.join(path_parts)
-            
-        headers = {'x-api-key': self.api_key}
         if self.client_id:
             # Always add client_id as query parameter if specified
-            if params is None:
-                params = {}
-            params['clientId'] = self.client_id
-            
-            # Also include it in header for legacy support
-            headers['Client-ID'] = self.client_id
+            # Copy so the mapping's own query params are never mutated
+            params = dict(params) if params else {}
+            params[_CLIENT_ID_PARAM] = self.client_id
             
         try:
-            # Use the session for better performance through connection reuse
-            url = f"{self.api_url}{endpoint}"
-            
-            # Use the appropriate HTTP method
-            if method.upper() == "GET":
-                response = self.session.get(url, params=params, headers=headers)
-            elif method.upper() == "PUT":
-                response = self.session.put(url, params=params, json=data, headers=headers)
-            elif method.upper() == "DELETE":
-                response = self.session.delete(url, params=params, headers=headers)
-            else:  # Default to POST
-                response = self.session.post(url, params=params, json=data, headers=headers)
-                
-            response.raise_for_status()
-            return response.json() if response.content else {'success': True}
+            # GET and DELETE never carry a body
+            if method == "GET" or method == "DELETE":
+                response = self._make_request(method, endpoint, params=params)
+            else:
+                body = json_utils.dumps(data) if data is not None else None
+                response = self._make_request(
+                    method, endpoint, params=params, data=body, headers=_JSON_HEADERS
+                )
         except Exception as e:
             # Minimize logging in the critical path
-            raise Exception(f"API call failed: {str(e)}")
+            raise ApiError(None, str(e)) from None
+        
+        status = response.status_code
+        if status >= 400:
+            raise ApiError(status, response.content)
+        
+        # Fire-and-forget endpoints usually answer with an empty body;
+        # check the headers before touching response.content
+        if status == 204 or response.headers.get('Content-Length') == '0':
+            return {'success': True}
+        content = response.content
+        if not content:
+            return {'success': True}
+        try:
+            return json_utils.loads(content)
+        except ValueError as e:
+            raise ApiError(None, f"Invalid JSON response: {e}") from None
+    
+    def call_endpoint_async(self, endpoint, params=None, data=None, path_params=None, method=None, tag=None):
+        """Call an endpoint on the worker pool without blocking the caller
+        
+        Takes the same arguments as call_endpoint. endpoint_call_finished is
+        emitted with ``tag`` once the call completes, so Qt receivers get the
+        result back on their own thread.
+        
+        Returns:
+            concurrent.futures.Future: Resolves to the call_endpoint result
+        """
+        return self._executor.submit(
+            self._run_endpoint_call, endpoint, params, data, path_params, method, tag
+        )
+    
+    def _run_endpoint_call(self, endpoint, params, data, path_params, method, tag):
+        """Worker body for call_endpoint_async"""
+        try:
+            response = self.call_endpoint(
+                endpoint, params=params, data=data, path_params=path_params, method=method
+            )
+        except Exception as e:
+            self.endpoint_call_finished.emit(tag, False, e)
+            raise
+        self.endpoint_call_finished.emit(tag, True, response)
+        return response
+    
+    def call_endpoint_coalesced(self, endpoint, params=None, data=None, path_params=None, method=None, tag=None):
+        """Queue an endpoint call that may be merged with later ones
+        
+        Identical calls (same method, endpoint, path parameters, params and
+        data) made within COALESCE_INTERVAL_MS collapse into a single
+        request; calls that differ in any of these are all sent. Only use
+        this for calls that are safe to send once for a burst of repeats
+        (mappings opt in with their "coalesce" flag); call_endpoint_async
+        never drops a call. Must be called from the thread that owns the
+        client.
+        """
+        path_key = tuple(sorted((k, str(v)) for k, v in path_params.items())) if path_params else ()
+        key = (method, endpoint, path_key, json_utils.dumps(params), json_utils.dumps(data))
+        self._pending_calls[key] = (endpoint, params, data, path_params, method, tag)
+        if not self._coalesce_timer.isActive():
+            self._coalesce_timer.start()
+    
+    def bind_endpoint(self, endpoint, method=None, coalesced=False):
+        """Return a cached callable for repeated calls to one endpoint
+        
+        The method and path are normalized once here, so the returned
+        partial of call_endpoint_async (or call_endpoint_coalesced) only
+        needs params, data, path_params and tag per call.
+        """
+        key = (endpoint, method, coalesced)
+        bound = self._bound_endpoints.get(key)
+        if bound is None:
+            if not method:
+                method, endpoint = split_endpoint(endpoint)
+            method = method.upper() if method else "POST"
+            if method not in _METHODS:
+                method = "POST"
+            if not endpoint.startswith('/'):
+                endpoint = '/' + endpoint
+            call = self.call_endpoint_coalesced if coalesced else self.call_endpoint_async
+            bound = self._bound_endpoints[key] = partial(call, endpoint, method=method)
+        return bound
+    
+    def _flush_pending_calls(self):
+        """Send one call for every distinct call queued during the coalescing window"""
+        pending = self._pending_calls
+        self._pending_calls = {}
+        for endpoint, params, data, path_params, method, tag in pending.values():
+            self.call_endpoint_async(endpoint, params, data, path_params, method, tag)
     
     def _make_request(self, method, endpoint, **kwargs):
         """Make a request to the API using the session for better performance"""
         if not endpoint.startswith('/'):
             endpoint = '/' + endpoint
             
-        headers = kwargs.get('headers', {})
-        # Use x-api-key header instead of Authorization
-        headers['x-api-key'] = self.api_key
-        if self.client_id:
-            headers['Client-ID'] = self.client_id
+        headers = kwargs.get('headers')
+        kwargs['headers'] = self._base_headers if headers is None else {**headers, **self._base_headers}
+        url = self._base_url + endpoint
         
-        kwargs['headers'] = headers
-        url = f"{self.api_url}{endpoint}"
+        if self._http2:
+            if 'data' in kwargs:
+                # httpx takes pre-encoded bodies as content=
+                kwargs['content'] = kwargs.pop('data')
+        else:
+            # requests has no session-wide timeout; httpx gets it at construction
+            kwargs.setdefault('timeout', self.REQUEST_TIMEOUT)
         
         return self.session.request(method, url, **kwargs)
     
+    def close(self):
+        """Stop the worker pool and release pooled connections held by the session"""
+        self._pending_calls = {}
+        
+        executor = getattr(self, '_executor', None)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        
+        session = getattr(self, 'session', None)
+        if session is not None:
+            session.close()
+            self.session = None
+    
     def __del__(self):
         """Clean up resources"""
-        if hasattr(self, 'session'):
-            self.session.close()
+        self.close()
@@ -1,41 +1,69 @@
 import os
 import logging
+from functools import lru_cache
 from PyQt6.QtWidgets import QMainWindow, QMessageBox
-from PyQt6.QtCore import QSettings, Qt, QTimer
+from PyQt6.QtCore import QSettings, Qt, QTimer, pyqtSignal
 from ui.main_window import MainWindow
 from midi_handler import MidiHandler
 from api_client import ApiClient
-from config_manager import ConfigManager
-from update_checker import UpdateManager
+from config_manager import ConfigManager, CachedSettings
 
 logger = logging.getLogger(__name__)
 
+_QSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ui", "style.qss")
+
+@lru_cache(maxsize=4)
+def _read_stylesheet(path, mtime_ns):
+    """Read a stylesheet, cached until the file's mtime changes"""
+    with open(path, "r") as f:
+        return f.read()
+
 class MidiRestApp(QMainWindow):
+    # Status bar updates; any thread may emit them (see show_status_nonblocking)
+    status_message = pyqtSignal(str)
+    
+    # Debounce window for saving settings after UI edits
+    SAVE_DELAY_MS = 500
+    
     def __init__(self, dev_mode=False):
         super().__init__()
         
         # Store dev mode flag
         self.dev_mode = dev_mode
+        # Per-event debug logging only happens in dev mode; decided once here
+        self._log_debug = dev_mode and logger.isEnabledFor(logging.DEBUG)
+        # (method, endpoint_path) -> status bar text, built once per endpoint
+        self._status_texts = {}
         logger.info("Initializing application components")
         
+        self.settings = CachedSettings(QSettings("FoundryVTT", "MidiRestIntegration"))
+        
         # Initialize components
         self.config_manager = ConfigManager()
-        self.api_client = ApiClient()
+        self.api_client = ApiClient(http2=self.settings.value("api/http2", False, type=bool))
         self.midi_handler = MidiHandler(auto_connect=False)  # Don't auto-connect
         
         # Load settings
         logger.debug("Loading application settings")
-        self.settings = QSettings("FoundryVTT", "MidiRestIntegration")
         self.load_settings()
         
+        # Coalesce bursts of config/mapping edits into a single save
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(self.SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self._do_save)
+        self._save_api_pending = False
+        self._save_mappings_pending = False
+        
         # Setup UI
         logger.debug("Setting up UI")
         self.ui = MainWindow(self)
         self.setCentralWidget(self.ui)
         self.setWindowTitle("MIDI to Foundry VTT REST API")
-          # Initialize update manager early to check for updates during startup
-        logger.debug("Initializing update manager")
-        self.update_manager = UpdateManager(self)
+        # The update manager is created after the window is first shown so
+        # it stays off the path to the first paint (see showEvent)
+        self.update_manager = None
+        self._update_check_scheduled = False
         
         # Load style sheet
         self.load_stylesheet()
@@ -43,17 +71,12 @@ class MidiRestApp(QMainWindow):
         # Connect signals
         self.connect_signals()
         
-        # Setup automatic update checking immediately
-        QTimer.singleShot(1000, lambda: self.update_manager.check_for_updates_async(silent=True))
-        
         logger.info("Application initialization complete")
         
     def load_stylesheet(self):
-        qss_path = os.path.join(os.path.dirname(__file__), "ui", "style.qss")
         try:
-            with open(qss_path, "r") as f:
-                self.setStyleSheet(f.read())
-                logger.debug("Stylesheet loaded successfully")
+            self.setStyleSheet(_read_stylesheet(_QSS_PATH, os.stat(_QSS_PATH).st_mtime_ns))
+            logger.debug("Stylesheet loaded successfully")
         except Exception as e:
             logger.error("Failed to load stylesheet: %s", str(e))
     
@@ -69,6 +92,7 @@ class MidiRestApp(QMainWindow):
         mappings = self.config_manager.load_mappings()
         logger.info("Loaded %d MIDI mappings", len(mappings))
         self.midi_handler.set_mappings(mappings)
+        self._mappings_digest = self._digest_mappings(mappings)
         
         # Load window state
         if self.settings.contains("window/geometry"):
@@ -80,80 +104,166 @@ class MidiRestApp(QMainWindow):
             # Default to maximized
             self.setWindowState(self.windowState() | Qt.WindowState.WindowMaximized)
         
-    def save_settings(self):
-        logger.debug("Saving application settings")
+    def save_settings(self, api=True, mappings=True):
+        """Schedule a settings save, restarting the debounce window
+        
+        api and mappings select which parts are written when the timer
+        fires; parts requested during the same window accumulate.
+        """
+        self._save_api_pending |= api
+        self._save_mappings_pending |= mappings
+        self._save_timer.start()
+    
+    def _do_save(self):
+        if self._save_api_pending:
+            self._save_api()
+        if self._save_mappings_pending:
+            self._save_mappings()
+        self._save_api_pending = self._save_mappings_pending = False
+    
+    def _save_api(self):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Saving application settings")
         self.settings.setValue("api/url", self.api_client.api_url)
         self.settings.setValue("api/key", self.api_client.api_key)
         self.settings.setValue("api/client_id", self.api_client.client_id)
         
-        # Save MIDI mappings
-        self.config_manager.save_mappings(self.midi_handler.mappings)
-        logger.info("Settings saved successfully")
-        
         # Save window state
         self.settings.setValue("window/geometry", self.saveGeometry())
         self.settings.setValue("window/state", self.saveState())
+        logger.info("Settings saved successfully")
+    
+    def _save_mappings(self):
+        self.config_manager.save_mappings(self.midi_handler.mappings)
     
     def connect_signals(self):
-        # Connect UI signals to handlers
-        self.ui.config_widget.save_config_signal.connect(self.on_config_changed)
-        self.ui.mapping_widget.mapping_changed_signal.connect(self.on_mapping_changed)
+        # Connection types are explicit so no signal hops through the event
+        # loop by accident. UI signals are emitted and handled on the GUI
+        # thread, so call the handlers directly.
+        self.ui.config_widget.save_config_signal.connect(
+            self.on_config_changed, Qt.ConnectionType.DirectConnection)
+        self.ui.mapping_changed_signal.connect(
+            self.on_mapping_changed, Qt.ConnectionType.DirectConnection)
+        
+        # The MIDI handler already batches mapped events over from its
+        # backend thread and emits them on the GUI thread
+        self.midi_handler.midi_signal_received.connect(
+            self.on_midi_signal, Qt.ConnectionType.DirectConnection)
         
-        # Connect MIDI handler to API client with parameters support
-        self.midi_handler.midi_signal_received.connect(self.on_midi_signal)
+        # show_status_nonblocking does its own coalesced hop onto the GUI
+        # thread, so it can be called directly from any thread
+        self.status_message.connect(self.ui.show_status_nonblocking, Qt.ConnectionType.DirectConnection)
+        # Emitted from API worker threads and must be marshalled onto the
+        # GUI thread
+        self.api_client.endpoint_call_finished.connect(
+            self.on_endpoint_call_finished, Qt.ConnectionType.QueuedConnection)
         logger.debug("All signals connected")
     
     def on_config_changed(self, url, key, client_id):
+        api = self.api_client
+        config = (url.rstrip('/'), key, client_id)
+        saved = (self.settings.value("api/url", ""), self.settings.value("api/key", ""),
+                 self.settings.value("api/client_id", ""))
+        # Both have to match: "Test Connection" reconfigures the client
+        # without saving, so the live values alone can't tell whether the
+        # settings are up to date
+        if config == saved and config == (api.api_url, api.api_key, api.client_id):
+            # Nothing to reconfigure or save; reuse the cached client list
+            logger.debug("Configuration unchanged")
+            api.fetch_clients()
+            return
+        
         logger.info("Configuration changed: URL=%s, Client ID=%s", url, client_id)
+        # The connection test in set_api_config also reloads the client list
         self.api_client.set_api_config(url, key, client_id)
-        self.save_settings()
+        self.save_settings(mappings=False)
+    
+    @staticmethod
+    def _digest_mappings(mappings):
+        """Content fingerprint used to skip saving unchanged mappings
         
-        # Refresh client list
-        self.ui.refresh_clients()
+        The mapping widget emits the handler's own dict after mutating it
+        in place, so the contents have to be compared rather than identity.
+        """
+        return hash(repr(mappings))
     
     def on_mapping_changed(self, mappings):
+        digest = self._digest_mappings(mappings)
+        if digest == self._mappings_digest:
+            logger.debug("MIDI mappings unchanged, skipping save")
+            return
+        self._mappings_digest = digest
         logger.info("MIDI mappings updated: %d mappings", len(mappings))
         self.midi_handler.set_mappings(mappings)
-        self.save_settings()
+        self.save_settings(api=False)
     
-    def on_midi_signal(self, midi_event, endpoint, query_params, body_params, path_params):
-        """Optimized handler for MIDI signals triggering API calls"""
+    def on_midi_signal(self, midi_event, method, endpoint_path, query_params, body_params, path_params,
+                       coalesce=False):
+        """Optimized handler for MIDI signals triggering API calls
+        
+        The endpoint arrives already split into method and path by the
+        MIDI handler; method is empty when the mapping didn't specify one.
+        coalesce is the mapping's opt-in to having repeats merged.
+        """
         try:
-            # Extract HTTP method if present in endpoint string
-            method = None
-            if " " in endpoint and endpoint.split(" ")[0] in ["GET", "POST", "PUT", "DELETE"]:
-                method, endpoint_path = endpoint.split(" ", 1)
-            else:
-                endpoint_path = endpoint
-                
             # Only log in dev mode to avoid performance overhead
-            if self.dev_mode:
+            if self._log_debug:
                 logger.debug("MIDI signal triggered API call: %s%s with params: %s, %s, path: %s", 
                            f"{method} " if method else "", endpoint_path, query_params, body_params, path_params)
             
-            # Make the API call directly with method
-            response = self.api_client.call_endpoint(
-                endpoint_path,
-                params=query_params, 
-                data=body_params,
-                path_params=path_params,
-                method=method
-            )
+            status = self._status_texts.get((method, endpoint_path))
+            if status is None:
+                status = f"API call: {f'{method} ' if method else ''}{endpoint_path}"
+                self._status_texts[(method, endpoint_path)] = status
             
-            # Update UI status in a non-blocking way
-            self.ui.show_status_nonblocking(f"API call: {f'{method} ' if method else ''}{endpoint_path}")
-            
-            # Minimal feedback in production mode
-            if self.dev_mode:
-                logger.debug("API call succeeded: %s, Response: %s", endpoint_path, response)
+            # Mappings flagged for it have bursts of identical calls merged
+            # into one request; everything else is sent as is. Either way
+            # the call runs on the API worker pool so the Qt thread never
+            # waits on the network, and the outcome arrives via
+            # on_endpoint_call_finished
+            call = self.api_client.bind_endpoint(endpoint_path, method, coalesced=coalesce)
+            call(params=query_params, data=body_params, path_params=path_params, tag=status)
         except Exception as e:
             if self.dev_mode:
                 logger.error("API call failed: %s, Error: %s", endpoint_path, str(e))
-            self.ui.show_status_nonblocking(f"Error: {str(e)}")
+            self.status_message.emit("Error: " + str(e))
+    
+    def on_endpoint_call_finished(self, status, success, result):
+        """Report the outcome of a background API call"""
+        if success:
+            if self._log_debug:
+                logger.debug("API call succeeded: %s, Response: %s", status, result)
+            self.status_message.emit(status)
+        else:
+            if self.dev_mode:
+                logger.error("API call failed: %s, Error: %s", status, str(result))
+            self.status_message.emit("Error: " + str(result))
+    
+    def _init_update_manager(self):
+        if self.update_manager is not None:
+            return
+        logger.debug("Initializing update manager")
+        # Imported here so its network and installer dependencies stay
+        # off the startup path
+        from update_checker import UpdateManager
+        self.update_manager = UpdateManager(self)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._update_check_scheduled:
+            # Runs as soon as the event loop is idle after the first paint
+            self._update_check_scheduled = True
+            QTimer.singleShot(0, self._start_update_check)
+    
+    def _start_update_check(self):
+        self._init_update_manager()
+        self.update_manager.check_for_updates_async(silent=True)
     
     def check_for_updates(self):
         """Manually check for updates."""
         logger.info("Manual update check requested")
+        if self.update_manager is None:
+            self._init_update_manager()
         self.update_manager.check_for_updates_async(silent=False)
     
     def show_status(self, message):
@@ -163,6 +273,11 @@ class MidiRestApp(QMainWindow):
     
     def closeEvent(self, event):
         logger.info("Application closing")
-        self.save_settings()
+        # Flush everything, including any pending debounced save
+        self._save_timer.stop()
+        self._save_api()
+        self._save_mappings()
+        self.settings.sync()
         self.midi_handler.close()
+        self.api_client.close()
         event.accept()
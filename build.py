@@ -6,6 +6,9 @@ import platform
 import shutil
 import subprocess
 import argparse
+import hashlib
+import importlib.metadata
+from functools import lru_cache
 from pathlib import Path
 
 # Import version information from central location
@@ -20,12 +23,53 @@ RESOURCE_FILES = [
     ("launchpad-mini-demo-2.json", ".")
 ]
 
+# Modules left out of every bundle
+EXCLUDES = ("tkinter", "matplotlib", "numpy", "scipy")
+
+@lru_cache(maxsize=None)
+def _resources_present():
+    """RESOURCE_FILES entries whose source exists, checked once per run."""
+    return tuple((src, dst) for src, dst in RESOURCE_FILES if os.path.exists(src))
+
+# Scratch state kept between build runs
+BUILD_CACHE_DIR = ".build_cache"
+PYINSTALLER_SENTINEL = os.path.join(BUILD_CACHE_DIR, "pyinstaller_ok")
+
+def _pyinstaller_stamp():
+    """Identify this interpreter's PyInstaller install without importing it."""
+    try:
+        version = importlib.metadata.version("pyinstaller")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+    return f"{hashlib.sha1(sys.executable.encode()).hexdigest()} {version}"
+
+def _write_pyinstaller_sentinel():
+    stamp = _pyinstaller_stamp()
+    if stamp:
+        os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+        with open(PYINSTALLER_SENTINEL, "w") as f:
+            f.write(stamp)
+
+@lru_cache(maxsize=1)
 def ensure_pyinstaller_installed():
-    """Check if PyInstaller is installed, and install it if not."""
+    """Check if PyInstaller is installed, and install it if not.
+    
+    A successful check is remembered in a sentinel file for this
+    interpreter and PyInstaller version, so later runs skip the import.
+    """
+    stamp = _pyinstaller_stamp()
+    if stamp:
+        try:
+            with open(PYINSTALLER_SENTINEL) as f:
+                if f.read() == stamp:
+                    print("PyInstaller is already installed.")
+                    return True
+        except OSError:
+            pass
+    
     try:
         import PyInstaller
         print("PyInstaller is already installed.")
-        return True
     except ImportError:
         print("Installing PyInstaller...")
         result = subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"], 
@@ -33,7 +77,8 @@ def ensure_pyinstaller_installed():
         if result.returncode != 0:
             print(f"Error installing PyInstaller: {result.stderr}")
             return False
-        return True
+    _write_pyinstaller_sentinel()
+    return True
 
 def get_platform_options():
     """Get platform-specific PyInstaller options."""
@@ -42,8 +87,7 @@ def get_platform_options():
     # Common options for all platforms
     options = {
         "name": APP_NAME,
-        "excludes": ["tkinter", "matplotlib", "numpy", "scipy"],
-        "clean": True,
+        "excludes": list(EXCLUDES),
         "noconfirm": True,
         "onefile": True,
         "windowed": True,  # Don't show console
@@ -51,10 +95,9 @@ def get_platform_options():
     }
     
     # Add resource files
-    for src, dst in RESOURCE_FILES:
-        if os.path.exists(src):
-            path_sep = ";" if os_name == "windows" else ":"
-            options["add_data"].append(f"{src}{path_sep}{dst}")
+    path_sep = ";" if os_name == "windows" else ":"
+    for src, dst in _resources_present():
+        options["add_data"].append(f"{src}{path_sep}{dst}")
     
     # Platform-specific options
     if os_name == "windows":
@@ -197,18 +240,45 @@ app = BUNDLE(
 """
 
     spec_file = f"{options['name']}_{platform_name}.spec"
+    
+    # Leave an up-to-date spec untouched so PyInstaller doesn't treat it as
+    # changed; the key also covers the bundled resources' contents
+    digest = hashlib.sha1(spec_content.encode("utf-8"))
+    for src, _ in _resources_present():
+        with open(src, "rb") as f:
+            digest.update(f.read())
+    key = digest.hexdigest()
+    hash_file = os.path.join(BUILD_CACHE_DIR, f"{spec_file}.sha1")
+    try:
+        with open(hash_file) as f:
+            if os.path.exists(spec_file) and f.read() == key:
+                print(f"Spec file {spec_file} is up to date.")
+                return spec_file
+    except OSError:
+        pass
+    
     with open(spec_file, "w") as f:
         f.write(spec_content)
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    with open(hash_file, "w") as f:
+        f.write(key)
     
     return spec_file
 
-def build_executable(platform_name, spec_file):
-    """Run PyInstaller to build the executable."""
+def build_executable(platform_name, spec_file, clean=False, universal=False):
+    """Run PyInstaller to build the executable.
+    
+    PyInstaller's work directory is kept between runs unless clean is set,
+    so repeated builds reuse the cached analysis.
+    """
     print(f"Building executable for {platform_name}...")
     
     cmd = [sys.executable, "-m", "PyInstaller", spec_file, "--noconfirm"]
+    if clean:
+        cmd.append("--clean")
     
-    if platform_name == "darwin":
+    if platform_name == "darwin" and universal:
+        # Both arm64 and x86_64 slices; otherwise build for the host arch
         cmd.append("--target-architecture=universal2")
     
     result = subprocess.run(cmd, check=False)
@@ -220,6 +290,55 @@ def build_executable(platform_name, spec_file):
         print(f"Successfully built executable for {platform_name}")
         return True
 
+def _link_or_copy(src, dst):
+    """Hardlink a build artifact into place, copying where links aren't possible."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def _build_one(platform_name, clean=False, universal=False):
+    """Generate the spec and build the executable for one platform.
+    
+    Returns True on success.
+    """
+    options, detected_platform = get_platform_options()
+    
+    # Override the detected platform with the target platform
+    if platform_name != detected_platform:
+        print(f"Warning: Building for {platform_name} on {detected_platform}.")
+        print("         Cross-platform builds may not work correctly.")
+    
+    # Create spec file
+    spec_file = create_spec_file(options, platform_name)
+    
+    # Build executable
+    ok = build_executable(platform_name, spec_file, clean=clean, universal=universal)
+    if ok:
+        # Copy to output directory
+        output_dir = os.path.join("dist", f"{APP_NAME}-{APP_VERSION}-{platform_name}")
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # Copy built files to output directory
+        if platform_name == "darwin":  # macOS
+            src = os.path.join("dist", f"{APP_NAME}.app")
+            dst = os.path.join(output_dir, f"{APP_NAME}.app")
+        else:  # Windows and Linux
+            src = os.path.join("dist", options["target_name"])
+            dst = os.path.join(output_dir, options["target_name"])
+        
+        if os.path.exists(src):
+            if os.path.isdir(src):
+                if os.path.exists(dst):
+                    shutil.rmtree(dst)
+                shutil.copytree(src, dst, copy_function=_link_or_copy)
+            else:
+                shutil.copy(src, dst)
+            print(f"Copied build to {output_dir}")
+        else:
+            print(f"Warning: Could not find built executable at {src}")
+    return ok
+
 def setup_resources_directory():
     """Create a resources directory if it doesn't exist and ensure an icon is present."""
     resources_dir = Path("resources")
@@ -243,6 +362,10 @@ def main():
     parser.add_argument("--platform", choices=["windows", "macos", "linux", "all"], 
                         default=platform.system().lower(),
                         help="Target platform(s) to build for (default: current platform)")
+    parser.add_argument("--clean-build", action="store_true",
+                        help="Clear PyInstaller's cache and rebuild from scratch")
+    parser.add_argument("--universal", action="store_true",
+                        help="Build a universal2 (arm64 + x86_64) macOS app")
     args = parser.parse_args()
     
     if args.platform == "macos":
@@ -279,41 +402,12 @@ def main():
         target_platforms = [args.platform]
     
     # Build for each target platform
-    for platform_name in target_platforms:
-        options, detected_platform = get_platform_options()
-        
-        # Override the detected platform with the target platform
-        if platform_name != detected_platform:
-            print(f"Warning: Building for {platform_name} on {detected_platform}.")
-            print("         Cross-platform builds may not work correctly.")
-        
-        # Create spec file
-        spec_file = create_spec_file(options, platform_name)
-        
-        # Build executable
-        if build_executable(platform_name, spec_file):
-            # Copy to output directory
-            output_dir = os.path.join("dist", f"{APP_NAME}-{APP_VERSION}-{platform_name}")
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # Copy built files to output directory
-            if platform_name == "darwin":  # macOS
-                src = os.path.join("dist", f"{APP_NAME}.app")
-                dst = os.path.join(output_dir, f"{APP_NAME}.app")
-            else:  # Windows and Linux
-                src = os.path.join("dist", options["target_name"])
-                dst = os.path.join(output_dir, options["target_name"])
-            
-            if os.path.exists(src):
-                if os.path.isdir(src):
-                    if os.path.exists(dst):
-                        shutil.rmtree(dst)
-                    shutil.copytree(src, dst)
-                else:
-                    shutil.copy(src, dst)
-                print(f"Copied build to {output_dir}")
-            else:
-                print(f"Warning: Could not find built executable at {src}")
+    results = [_build_one(platform_name, args.clean_build, universal=args.universal)
+               for platform_name in target_platforms]
+    
+    if not all(results):
+        print("Build process completed with errors.")
+        sys.exit(1)
     
     print("Build process completed.")
 
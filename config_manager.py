@@ -1,48 +1,148 @@
-import json
 import os
+import sys
+import tempfile
+import json_utils
 import logging
-from PyQt6.QtCore import QObject
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from PyQt6.QtCore import QObject, pyqtSignal
 from typing import Dict, List, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+@lru_cache(maxsize=8192)
+def _encode_key(key):
+    """(msg_type, channel, note/control) -> "msg_type:channel:note" """
+    return "%s:%d:%d" % key
+
+@lru_cache(maxsize=8192)
+def _decode_key(key):
+    """"msg_type:channel:note" -> (msg_type, channel, note/control)"""
+    msg_type, channel, note_control = key.split(':')
+    return (sys.intern(msg_type), int(channel), int(note_control))
+
+def _encode_mappings(mappings):
+    """{(msg_type, channel, note/control): mapping} -> the JSON file layout"""
+    serializable_mappings = {}
+    for tuple_key, mapping_data in mappings.items():
+        key = _encode_key(tuple_key)
+        
+        # Handle both old and new formats
+        if isinstance(mapping_data, dict):
+            serializable_mappings[key] = mapping_data
+        else:
+            # Legacy format: just the endpoint string
+            serializable_mappings[key] = {
+                "endpoint": mapping_data,
+                "query_params": {},
+                "body_params": {}
+            }
+    return serializable_mappings
+
+def _decode_mappings(serialized_mappings):
+    """Mappings as stored in a JSON file -> {(msg_type, channel, note/control): mapping}
+    
+    Legacy endpoint-only strings are wrapped in the current mapping format;
+    entries that are neither are logged and left out.
+    """
+    _dict = dict
+    mappings = {}
+    for key, mapping_data in serialized_mappings.items():
+        if type(mapping_data) is _dict and "endpoint" in mapping_data:
+            mappings[_decode_key(key)] = mapping_data
+        elif isinstance(mapping_data, str):
+            mappings[_decode_key(key)] = {
+                "endpoint": mapping_data, "query_params": {}, "body_params": {}
+            }
+        else:
+            logger.warning("Skipping invalid mapping %s: %r", key, mapping_data)
+    return mappings
+
+class CachedSettings:
+    """In-memory cache in front of a QSettings store
+    
+    Each key is read from the backend (registry/INI file) at most once, and
+    setValue only writes through when the value actually changed. Call
+    sync() to flush pending writes to disk.
+    """
+    def __init__(self, settings):
+        self._settings = settings
+        self._cache = {}
+    
+    def _get(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._settings.value(key) if self._settings.contains(key) else _MISSING
+            self._cache[key] = value
+            return value
+    
+    def contains(self, key):
+        return self._get(key) is not _MISSING
+    
+    def value(self, key, default=None, type=None):
+        value = self._get(key)
+        if value is _MISSING:
+            return default
+        if type is not None and not isinstance(value, type):
+            # e.g. "true" read back from an INI file; let Qt convert it once
+            value = self._settings.value(key, default, type=type)
+            self._cache[key] = value
+        return value
+    
+    def setValue(self, key, value):
+        if self._get(key) == value:
+            return
+        self._cache[key] = value
+        self._settings.setValue(key, value)
+    
+    def sync(self):
+        self._settings.sync()
+
 class ConfigManager(QObject):
+    # Results of import_config_async/export_config_async, emitted from the
+    # I/O worker thread
+    import_finished = pyqtSignal(str, object)  # filename, mappings (None on failure)
+    export_finished = pyqtSignal(str, bool)  # filename, success
+    
     def __init__(self):
         super().__init__()
         self.config_dir = os.path.join(os.path.expanduser('~'), '.foundry_midi_rest')
         self.mappings_file = os.path.join(self.config_dir, 'mappings.json')
+        self._last_saved = None  # bytes last written to mappings_file
+        self._executor = None  # created on first async import/export
         logger.info("Config manager initialized: %s", self.config_dir)
         self._ensure_config_dir()
     
     def _ensure_config_dir(self):
         """Ensure the configuration directory exists"""
-        if not os.path.exists(self.config_dir):
-            logger.info("Creating configuration directory: %s", self.config_dir)
-            os.makedirs(self.config_dir)
+        os.makedirs(self.config_dir, exist_ok=True)
     
     def save_mappings(self, mappings: Dict[Tuple, any]):
         """Save MIDI mappings to file"""
         logger.info("Saving %d MIDI mappings to %s", len(mappings), self.mappings_file)
         
-        # Convert tuple keys to strings for JSON serialization
-        serializable_mappings = {}
-        for (msg_type, channel, note_control), mapping_data in mappings.items():
-            key = f"{msg_type}:{channel}:{note_control}"
-            
-            # Handle both old and new formats
-            if isinstance(mapping_data, dict):
-                serializable_mappings[key] = mapping_data
-            else:
-                # Legacy format: just the endpoint string
-                serializable_mappings[key] = {
-                    "endpoint": mapping_data,
-                    "query_params": {},
-                    "body_params": {}
-                }
-        
         try:
-            with open(self.mappings_file, 'w') as f:
-                json.dump(serializable_mappings, f, indent=2)
+            data = json_utils.dumps(_encode_mappings(mappings), indent=True)
+            if data == self._last_saved:
+                logger.debug("Mappings unchanged, not rewriting file")
+                return
+            # Write a temp file next to the real one and swap it in, so a
+            # crash mid-write never leaves a truncated mappings file
+            fd, tmp_path = tempfile.mkstemp(dir=self.config_dir, prefix=".mappings-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self.mappings_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._last_saved = data
             logger.debug("Mappings saved successfully")
         except Exception as e:
             logger.error("Error saving mappings: %s", str(e))
@@ -55,25 +155,10 @@ class ConfigManager(QObject):
         
         try:
             logger.info("Loading MIDI mappings from %s", self.mappings_file)
-            with open(self.mappings_file, 'r') as f:
-                serialized_mappings = json.load(f)
+            with open(self.mappings_file, 'rb') as f:
+                serialized_mappings = json_utils.loads(f.read())
             
-            # Convert string keys back to tuples
-            mappings = {}
-            for key, mapping_data in serialized_mappings.items():
-                msg_type, channel, note_control = key.split(':')
-                tuple_key = (msg_type, int(channel), int(note_control))
-                
-                # Handle both old and new formats
-                if isinstance(mapping_data, dict) and "endpoint" in mapping_data:
-                    mappings[tuple_key] = mapping_data
-                else:
-                    # Legacy format or just the endpoint string
-                    mappings[tuple_key] = {
-                        "endpoint": mapping_data if isinstance(mapping_data, str) else mapping_data["endpoint"],
-                        "query_params": mapping_data.get("query_params", {}),
-                        "body_params": mapping_data.get("body_params", {})
-                    }
+            mappings = _decode_mappings(serialized_mappings)
             
             logger.info("Loaded %d MIDI mappings", len(mappings))
             return mappings
@@ -81,44 +166,64 @@ class ConfigManager(QObject):
             logger.error("Error loading mappings: %s", str(e))
             return {}
     
-    def export_config(self, filename: str):
-        """Export configuration to a file"""
+    def _submit(self, fn, *args):
+        # A single worker keeps imports and exports in the order requested
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="config-io")
+        self._executor.submit(fn, *args)
+    
+    def import_config_async(self, filename: str):
+        """import_config on a worker thread; the result arrives via import_finished"""
+        self._submit(lambda: self.import_finished.emit(filename, self.import_config(filename)))
+    
+    def export_config_async(self, filename: str, mappings: Optional[Dict[Tuple, any]] = None):
+        """export_config on a worker thread; the result arrives via export_finished"""
+        self._submit(lambda: self.export_finished.emit(
+            filename, self.export_config(filename, mappings)))
+    
+    def export_config(self, filename: str, mappings: Optional[Dict[Tuple, any]] = None) -> bool:
+        """Export configuration to a file, returning whether it succeeded
+        
+        Pass the live mappings to export them as they are now; the saved
+        file can trail them while a debounced save is pending.
+        """
         if not filename.endswith('.json'):
             filename += '.json'
         
         logger.info("Exporting configuration to %s", filename)
             
         try:
-            mappings = self.load_mappings()
-            serializable_mappings = {
-                f"{msg_type}:{channel}:{note_control}": endpoint
-                for (msg_type, channel, note_control), endpoint in mappings.items()
-            }
+            if mappings is None:
+                mappings = self.load_mappings()
             
-            with open(filename, 'w') as f:
-                json.dump(serializable_mappings, f, indent=2)
+            # Same layout as the saved mappings file, written in one call and
+            # flushed to disk (this runs on the I/O worker when async)
+            data = json_utils.dumps(_encode_mappings(mappings), indent=True)
+            with open(filename, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
             logger.info("Configuration exported successfully")
+            return True
         except Exception as e:
             logger.error("Error exporting configuration: %s", str(e))
+            return False
     
-    def import_config(self, filename: str) -> Dict[Tuple, str]:
-        """Import configuration from a file"""
+    def import_config(self, filename: str) -> Optional[Dict[Tuple, str]]:
+        """Import configuration from a file, returning None if it can't be read
+        
+        Only reads the file; the caller saves the result from the GUI
+        thread, which is the only one writing the mappings file.
+        """
         logger.info("Importing configuration from %s", filename)
         try:
-            with open(filename, 'r') as f:
-                serialized_mappings = json.load(f)
-            
-            # Convert string keys back to tuples
-            mappings = {}
-            for key, endpoint in serialized_mappings.items():
-                msg_type, channel, note_control = key.split(':')
-                mappings[(msg_type, int(channel), int(note_control))] = endpoint
+            with open(filename, 'rb') as f:
+                serialized_mappings = json_utils.loads(f.read())
             
-            # Save the imported mappings
-            self.save_mappings(mappings)
+            mappings = _decode_mappings(serialized_mappings)
             logger.info("Imported %d mappings", len(mappings))
             
             return mappings
         except Exception as e:
             logger.error("Error importing configuration: %s", str(e))
-            return {}
+            return None
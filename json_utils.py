@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# json_utils.py - JSON encoding helpers
+"""
+JSON encoding helpers.
+Uses orjson when it is installed and falls back to the standard library.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speed-up
+    orjson = None
+
+def dumps(obj, indent=False) -> bytes:
+    """Serialize obj to UTF-8 encoded JSON bytes.
+    
+    indent=True pretty-prints with two spaces, for files people may edit.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def loads(data):
+    """Deserialize JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
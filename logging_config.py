@@ -1,6 +1,8 @@
 import os
+import atexit
+import queue
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
 
 def setup_logging(log_level=logging.INFO):
@@ -22,6 +24,9 @@ def setup_logging(log_level=logging.INFO):
     # Remove existing handlers to avoid duplicates if setup_logging is called multiple times
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    if setup_logging.listener is not None:
+        setup_logging.listener.stop()
+        setup_logging.listener = None
     
     # Create formatters
     file_formatter = logging.Formatter(
@@ -46,9 +51,13 @@ def setup_logging(log_level=logging.INFO):
     console_handler.setLevel(log_level)
     console_handler.setFormatter(console_formatter)
     
-    # Add both handlers to logger
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    # Loggers only enqueue records; the file and console writes happen on
+    # the listener's thread so the MIDI and GUI threads never block on I/O
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    setup_logging.listener = listener
     
     # Log startup information
     logging.info("=" * 80)
@@ -59,6 +68,15 @@ def setup_logging(log_level=logging.INFO):
     
     return root_logger
 
+setup_logging.listener = None
+
+def _stop_listener():
+    # Flush queued records before the interpreter exits
+    if setup_logging.listener is not None:
+        setup_logging.listener.stop()
+
+atexit.register(_stop_listener)
+
 def get_logger(name):
     """
     Get a named logger for a specific module.
@@ -1,10 +1,6 @@
 import sys
 import logging
 import argparse
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QTimer, Qt
-from app import MidiRestApp
-from logging_config import setup_logging
 
 if __name__ == "__main__":
     # Parse command line arguments
@@ -12,6 +8,12 @@ if __name__ == "__main__":
     parser.add_argument("--dev", action="store_true", help="Enable development mode with detailed logging")
     args = parser.parse_args()
     
+    # Imported only now so --help doesn't pay for loading Qt
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QTimer, Qt
+    from app import MidiRestApp
+    from logging_config import setup_logging
+    
     # Setup logging based on mode
     if args.dev:
         setup_logging(logging.DEBUG)
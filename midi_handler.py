@@ -1,85 +1,130 @@
 import mido
+import os
+import sys
 import time
 import logging
-from PyQt6.QtCore import QObject, pyqtSignal, QThread
+from array import array
+from PyQt6.QtCore import QMetaObject, QObject, Qt, pyqtSignal, pyqtSlot
 from typing import Dict, List, Any, Optional, Tuple
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from api_client import split_endpoint
 
 logger = logging.getLogger(__name__)
 
-class MidiListenerThread(QThread):
-    midi_event = pyqtSignal(object)
-    
-    def __init__(self, port_name, buffer_size=10):
-        super().__init__()
-        self.port_name = port_name
-        self._running = True
-        # Modified buffer design that stores the message key and a timestamp
-        # This will allow repeated button presses after a small timeout
-        self._message_buffer = {}  # {key: timestamp}
-        self._buffer_timeout = 0.1  # 100ms timeout for duplicate messages
-        logger.debug("MIDI listener thread initialized for port: %s", port_name)
-    
-    def run(self):
-        logger.info("Starting MIDI listener thread for: %s", self.port_name)
-        try:
-            with mido.open_input(self.port_name) as port:
-                logger.debug("MIDI port opened: %s", self.port_name)
-                while self._running:
-                    for message in port.iter_pending():
-                        # Create a unique key for the message
-                        message_key = (message.type, message.channel, 
-                                     getattr(message, 'note', -1), 
-                                     getattr(message, 'control', -1))
-                        
-                        current_time = time.time()
-                        
-                        # Check if this is a repeated message within the timeout period
-                        # For note_on/note_off pairs, we always process both
-                        if (message_key in self._message_buffer and 
-                            message.type not in ['note_off', 'note_on'] and
-                            current_time - self._message_buffer[message_key] < self._buffer_timeout):
-                            # Skip too-frequent duplicate messages
-                            continue
-                        
-                        # Update the timestamp and process the message
-                        self._message_buffer[message_key] = current_time
-                        self.midi_event.emit(message)
-                        
-                    # Optimized sleep time for lower latency
-                    time.sleep(0.001)  # 1ms polling is enough for real-time performance
-        except Exception as e:
-            logger.error("MIDI Error: %s", str(e))
-        logger.info("MIDI listener thread stopped")
-    
-    def stop(self):
-        logger.debug("Stopping MIDI listener thread")
-        self._running = False
+# Message types, interned: mido sets message.type from its own string
+# literals, so incoming messages can be matched with `is`
+NOTE_ON = sys.intern('note_on')
+NOTE_OFF = sys.intern('note_off')
+CONTROL_CHANGE = sys.intern('control_change')
+
+# Position of each mappable type's table in MidiHandler._route_tables
+_NOTE_ON_TABLE, _NOTE_OFF_TABLE, _CC_TABLE = range(3)
+_TABLE_INDEX = {NOTE_ON: _NOTE_ON_TABLE, NOTE_OFF: _NOTE_OFF_TABLE, CONTROL_CHANGE: _CC_TABLE}
+
+# High-rate system real-time messages that can't be mapped; dropped on
+# arrival so a clock stream doesn't cost a dedupe check and signal each
+_IGNORED_TYPES = frozenset((sys.intern('clock'), sys.intern('active_sensing')))
 
+def _new_route_tables():
+    """Tuple of tables (see _TABLE_INDEX), table[channel][note/control] = route or None"""
+    return tuple([[None] * 128 for _ in range(16)] for _ in _TABLE_INDEX)
+
+def _raise_thread_priority() -> bool:
+    """Best effort: have the OS favour the calling thread over normal work
+    
+    Uses SCHED_FIFO on Linux and TIME_CRITICAL on Windows. Returns False
+    when the platform has no such call or the process lacks permission.
+    """
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            THREAD_PRIORITY_TIME_CRITICAL = 15
+            return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(),
+                                                   THREAD_PRIORITY_TIME_CRITICAL))
+        if hasattr(os, 'sched_setscheduler'):
+            # pid 0 is the calling thread on Linux
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(10))
+            return True
+    except (OSError, AttributeError):
+        pass
+    return False
 
 class MidiHandler(QObject):
-    midi_signal_received = pyqtSignal(object, str, dict, dict, dict)  # message, endpoint, query_params, body_params, path_params
+    midi_signal_received = pyqtSignal(object, str, str, dict, dict, dict, bool)  # message, method, endpoint_path, query_params, body_params, path_params, coalesce
     midi_devices_changed = pyqtSignal(list)
+    # Every incoming message, mapped or not (e.g. for MIDI learn); only
+    # emitted while something is connected to it
+    midi_message_received = pyqtSignal(object)
+    # Repeats of the same non-note message within this window are dropped
+    DUPLICATE_TIMEOUT_NS = 100_000_000
+    # Slots in the duplicate filter's ring; must be a power of two
+    DEDUPE_SLOTS = 64
+    # Mapped events waiting for the GUI thread; the oldest are dropped
+    # if it falls this far behind
+    PENDING_LIMIT = 128
+    # Seconds a device enumeration is reused before the OS is asked again
+    DEVICE_CACHE_TTL = 2.0
     
     def __init__(self, auto_connect=False):
         super().__init__()
         self.mappings = {}  # {(msg_type, channel, note/control): endpoint}
+        # The mappings pre-split into what the signal carries, laid out as
+        # dense per-type [channel][note/control] tables so an incoming
+        # message is routed by indexing alone; see _new_route_tables.
+        # Each route is (method, endpoint_path, query_params, body_params,
+        # path_params, coalesce). Replaced wholesale by set_mappings, so the MIDI
+        # thread always sees a complete set of tables
+        self._route_tables = _new_route_tables()
+        # (message, route, received_ns) entries handed from the MIDI
+        # thread to the GUI thread. deque append/popleft are atomic, so with one producer
+        # and one consumer no lock is needed. Only the first event of a
+        # burst posts a call to _drain; the rest ride along with it
+        self._pending = deque(maxlen=self.PENDING_LIMIT)
+        self._drain_scheduled = False
         self.current_device = None
-        self.listener_thread = None
+        self._port = None
+        # Duplicate filter: fixed-size table of (message key, last seen)
+        # indexed by the key's hash, so memory stays bounded however many
+        # distinct messages a device sends; a colliding key evicts the slot
+        self._dedupe_keys = [None] * self.DEDUPE_SLOTS
+        self._dedupe_ts = array('q', bytes(8 * self.DEDUPE_SLOTS))
+        # Whether the backend thread's priority has been raised; done from
+        # its first callback, as that's the only code that runs on it
+        self._priority_set = False
+        # Cached so per-message paths skip the logging level check;
+        # refreshed on connect in case logging was reconfigured
+        self._log_debug = logger.isEnabledFor(logging.DEBUG)
         logger.info("MIDI handler initialized")
         
         # Cache device list but don't connect automatically
         self._cached_devices = []
+        self._devices_checked = None  # time.monotonic() of the last enumeration
+        self._device_executor = None  # created on first background refresh
+        self._device_scan = None  # Future of the running background refresh
         if auto_connect:
             self.refresh_devices()
     
-    def refresh_devices(self) -> List[str]:
-        """Refresh the list of MIDI devices without auto-connecting"""
+    def _devices_fresh(self) -> bool:
+        return (self._devices_checked is not None and
+                time.monotonic() - self._devices_checked < self.DEVICE_CACHE_TTL)
+    
+    def refresh_devices(self, force=False) -> List[str]:
+        """Refresh the list of MIDI devices without auto-connecting
+        
+        Enumerating opens the OS MIDI subsystem, which can take tens of
+        milliseconds, so a list younger than DEVICE_CACHE_TTL is returned
+        as is unless force is set.
+        """
+        if not force and self._devices_fresh():
+            return self._cached_devices
         try:
             devices = mido.get_input_names()
             self._cached_devices = devices
+            self._devices_checked = time.monotonic()
             logger.info("Found %d MIDI input devices", len(devices))
-            if logger.level <= logging.DEBUG:
+            if self._log_debug:
                 for device in devices:
                     logger.debug("MIDI device: %s", device)
             self.midi_devices_changed.emit(devices)
@@ -88,6 +133,21 @@ class MidiHandler(QObject):
             logger.error("Error refreshing MIDI devices: %s", str(e))
             return []
     
+    def refresh_devices_async(self, force=False):
+        """Like refresh_devices, but enumerates on a worker thread
+        
+        The list is delivered through midi_devices_changed. A request made
+        while a refresh is already running is folded into it.
+        """
+        if not force and self._devices_fresh():
+            self.midi_devices_changed.emit(self._cached_devices)
+            return
+        if self._device_scan is not None and not self._device_scan.done():
+            return
+        if self._device_executor is None:
+            self._device_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="midi-devices")
+        self._device_scan = self._device_executor.submit(self.refresh_devices, True)
+    
     def get_cached_devices(self) -> List[str]:
         """Get the cached device list without querying hardware"""
         if not self._cached_devices:
@@ -96,38 +156,131 @@ class MidiHandler(QObject):
         return self._cached_devices
     
     def connect_to_device(self, device_name: str) -> bool:
-        """Connect to a MIDI device"""
-        if self.listener_thread and self.listener_thread.isRunning():
-            logger.debug("Stopping existing MIDI listener thread")
-            self.listener_thread.stop()
-            self.listener_thread.wait()
+        """Connect to a MIDI device
+        
+        The port is opened with a callback, so the MIDI backend's own thread
+        delivers each message straight to _on_midi_raw; only messages that
+        match a mapping (or are wanted by a learn-mode listener) are
+        handed to the Qt event loop.
+        """
+        self.close()
+        self._log_debug = logger.isEnabledFor(logging.DEBUG)
         
         try:
             logger.info("Connecting to MIDI device: %s", device_name)
-            self.listener_thread = MidiListenerThread(device_name)
-            self.listener_thread.midi_event.connect(self._process_midi_message)
-            self.listener_thread.start()
+            self._dedupe_keys = [None] * self.DEDUPE_SLOTS
+            self._dedupe_ts = array('q', bytes(8 * self.DEDUPE_SLOTS))
+            self._priority_set = False
+            self._port = mido.open_input(device_name, callback=self._on_midi_raw)
             self.current_device = device_name
             logger.info("Successfully connected to MIDI device")
             return True
         except Exception as e:
             logger.error("Failed to connect to MIDI device: %s - %s", device_name, str(e))
-            self.listener_thread = None  # Fix: Clear the reference if connection failed
+            self._port = None
             return False
     
+    def _on_midi_raw(self, message):
+        """Called on the MIDI backend's thread for every incoming message"""
+        if not self._priority_set:
+            self._priority_set = True
+            raised = _raise_thread_priority()
+            logger.info("MIDI input thread priority %s", "raised" if raised else "left at default")
+        msg_type = message.type
+        if msg_type in _IGNORED_TYPES:
+            return
+        try:
+            # Monotonic, so clock adjustments can't open or close the
+            # duplicate window; also stamped on the queued event
+            now_ns = time.monotonic_ns()
+            
+            # Skip too-frequent duplicates; note_on/note_off pairs always pass
+            if msg_type is not NOTE_ON and msg_type is not NOTE_OFF:
+                if msg_type is CONTROL_CHANGE:
+                    message_key = (msg_type, message.channel, message.control)
+                else:
+                    # e.g. polytouch carries a note, sysex has no channel
+                    message_key = (msg_type, getattr(message, 'channel', -1),
+                                   getattr(message, 'note', -1))
+                slot = hash(message_key) & (self.DEDUPE_SLOTS - 1)
+                if (self._dedupe_keys[slot] == message_key and
+                        now_ns - self._dedupe_ts[slot] < self.DUPLICATE_TIMEOUT_NS):
+                    return
+                self._dedupe_keys[slot] = message_key
+                self._dedupe_ts[slot] = now_ns
+            
+            if self.receivers(self.midi_message_received):
+                self.midi_message_received.emit(message)
+            self._process_midi_message(message, now_ns)
+        except Exception as e:
+            logger.error("MIDI Error: %s", str(e))
+    
+    @staticmethod
+    def _compile_route(mapping_data):
+        """Split a mapping into the values emitted with midi_signal_received
+        
+        Done once when the mapping is installed, so incoming MIDI events
+        don't have to parse the "METHOD /path" endpoint string. Returns
+        None (after logging) for a mapping that can't be routed.
+        """
+        if isinstance(mapping_data, dict):
+            endpoint = mapping_data.get("endpoint")
+            query_params = mapping_data.get("query_params", {})
+            body_params = mapping_data.get("body_params", {})
+            path_params = mapping_data.get("path_params", {})
+            # Opt-in: repeats may be merged, see ApiClient.call_endpoint_coalesced
+            coalesce = bool(mapping_data.get("coalesce", False))
+        else:
+            # Legacy format: just the endpoint string
+            endpoint = mapping_data
+            query_params = {}
+            body_params = {}
+            path_params = {}
+            coalesce = False
+        if not isinstance(endpoint, str) or not all(
+                isinstance(p, dict) for p in (query_params, body_params, path_params)):
+            logger.warning("Ignoring invalid mapping: %r", mapping_data)
+            return None
+        method, endpoint_path = split_endpoint(endpoint)
+        return (method or "", endpoint_path, query_params, body_params, path_params, coalesce)
+    
+    @staticmethod
+    def _install_route(tables, key, route):
+        """Store route (or None to clear) in tables at a mapping key's slot"""
+        msg_type, channel, note_or_control = key
+        index = _TABLE_INDEX.get(msg_type)
+        if index is None or not (0 <= channel < 16 and 0 <= note_or_control < 128):
+            logger.warning("Ignoring mapping with invalid MIDI key: %s", key)
+            return
+        tables[index][channel][note_or_control] = route
+    
     def set_mappings(self, mappings: Dict[Tuple, str]):
         """Set MIDI mappings {(msg_type, channel, note/control): endpoint}"""
+        if mappings is self.mappings:
+            # Our own dict handed back (e.g. by the mapping widget);
+            # add_mapping/remove_mapping already kept the routes in sync
+            return
+        tables = _new_route_tables()
+        for key, data in mappings.items():
+            self._install_route(tables, key, self._compile_route(data))
         self.mappings = mappings
+        self._route_tables = tables
         logger.info("Set %d MIDI mappings", len(mappings))
-        for key, endpoint in mappings.items():
-            logger.debug("Mapping: %s -> %s", key, endpoint)
+        if self._log_debug:
+            for key, endpoint in mappings.items():
+                logger.debug("Mapping: %s -> %s", key, endpoint)
     
     def add_mapping(self, msg_type: str, channel: int, 
                     note_or_control: int, endpoint: str,
                     query_params: dict = None,
                     body_params: dict = None,
-                    path_params: dict = None):
-        """Add a new MIDI mapping with parameters"""
+                    path_params: dict = None,
+                    coalesce: bool = False):
+        """Add a new MIDI mapping with parameters
+        
+        coalesce lets rapid repeats of this mapping's call be merged into
+        one request; only set it when sending the call once is enough.
+        """
         key = (msg_type, channel, note_or_control)
         self.mappings[key] = {
             "endpoint": endpoint,
@@ -135,6 +288,9 @@ class MidiHandler(QObject):
             "body_params": body_params or {},
             "path_params": path_params or {}
         }
+        if coalesce:
+            self.mappings[key]["coalesce"] = True
+        self._install_route(self._route_tables, key, self._compile_route(self.mappings[key]))
         logger.info("Added MIDI mapping: (%s, %d, %d) -> %s with params", 
                    msg_type, channel, note_or_control, endpoint)
     
@@ -145,45 +301,53 @@ class MidiHandler(QObject):
             mapping_data = self.mappings[key]
             endpoint = mapping_data["endpoint"] if isinstance(mapping_data, dict) else mapping_data
             del self.mappings[key]
+            self._install_route(self._route_tables, key, None)
             logger.info("Removed MIDI mapping: (%s, %d, %d) -> %s", 
                       msg_type, channel, note_or_control, endpoint)
     
-    def _process_midi_message(self, message):
-        """Process incoming MIDI message and trigger API calls if mapped"""
-        key = None
+    def _process_midi_message(self, message, received_ns):
+        """Queue an incoming MIDI message for the GUI thread if it is mapped
         
-        # Use direct access to message attributes for performance
-        if message.type == 'note_on' and message.velocity > 0:
-            key = ('note_on', message.channel, message.note)
-        elif message.type == 'note_off' or (message.type == 'note_on' and message.velocity == 0):
-            key = ('note_off', message.channel, message.note)
-        elif message.type == 'control_change':
-            key = ('control_change', message.channel, message.control)
+        Runs on the MIDI backend's thread; see _drain for the other side.
+        """
+        tables = self._route_tables
+        msg_type = message.type
+        if msg_type is CONTROL_CHANGE:
+            route = tables[_CC_TABLE][message.channel][message.control]
+        elif msg_type is NOTE_ON:
+            # note_on with velocity 0 is a note_off, as many devices send it
+            table = tables[_NOTE_ON_TABLE] if message.velocity else tables[_NOTE_OFF_TABLE]
+            route = table[message.channel][message.note]
+        elif msg_type is NOTE_OFF:
+            route = tables[_NOTE_OFF_TABLE][message.channel][message.note]
+        else:
+            return
         
-        # Fast path for mapped keys
-        if key and key in self.mappings:
-            mapping_data = self.mappings[key]
-            
-            # Handle both old and new mapping formats with minimal processing
-            if isinstance(mapping_data, dict):
-                endpoint = mapping_data["endpoint"]
-                query_params = mapping_data.get("query_params", {})
-                body_params = mapping_data.get("body_params", {})
-                path_params = mapping_data.get("path_params", {})
-            else:
-                # Legacy format: just the endpoint string
-                endpoint = mapping_data
-                query_params = {}
-                body_params = {}
-                path_params = {}
-                
-            # Update the signal to include path parameters
-            self.midi_signal_received.emit(message, endpoint, query_params, body_params, path_params)
+        if route is None:
+            return
+        self._pending.append((message, route, received_ns))
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            QMetaObject.invokeMethod(self, "_drain", Qt.ConnectionType.QueuedConnection)
+    
+    @pyqtSlot()
+    def _drain(self):
+        """Emit midi_signal_received for every queued event, on the GUI thread"""
+        # Cleared before draining: anything queued after this point either
+        # is picked up below or schedules another drain
+        self._drain_scheduled = False
+        pending = self._pending
+        while pending:
+            message, route, received_ns = pending.popleft()
+            if self._log_debug:
+                logger.debug("MIDI %s dispatched %.2f ms after arrival", message.type,
+                             (time.monotonic_ns() - received_ns) / 1e6)
+            self.midi_signal_received.emit(message, *route)
     
     def close(self):
         """Close MIDI connections"""
-        if self.listener_thread and self.listener_thread.isRunning():
+        if self._port is not None:
             logger.info("Closing MIDI connections")
-            self.listener_thread.stop()
-            self.listener_thread.wait()
-            logger.debug("MIDI listener thread stopped")
+            self._port.close()
+            self._port = None
+            logger.debug("MIDI port closed")
@@ -53,6 +53,8 @@ class ConfigWidget(QWidget):
         self.status_label = QLabel("Not connected")
         self.status_label.setWordWrap(True)  # Enable word wrapping
         self.status_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
+        # Make sure the status label doesn't expand the layout
+        self.status_label.setMinimumWidth(200)
         api_layout.addRow("Status:", self.status_label)
         
         # Client Configuration group
@@ -68,7 +70,7 @@ class ConfigWidget(QWidget):
         # Refresh clients button
         refresh_button_layout = QHBoxLayout()
         self.refresh_button = QPushButton("Refresh Clients")
-        self.refresh_button.clicked.connect(self.fetch_clients)
+        self.refresh_button.clicked.connect(self.on_refresh_clicked)
         refresh_button_layout.addWidget(self.refresh_button)
         refresh_button_layout.addStretch()
         client_layout.addRow("", refresh_button_layout)
@@ -123,21 +125,24 @@ class ConfigWidget(QWidget):
             self.status_label.setText(f"Error: {message}")
             self.status_label.setStyleSheet("color: red")
             self.client_combo.setEnabled(False)
-        
-        # Make sure the status label doesn't expand the layout
-        self.status_label.setMinimumWidth(200)  # Set a reasonable minimum width
-        self.adjustSize()  # Adjust the size of the widget to fit contents
     
-    def fetch_clients(self):
-        """Fetch clients from the API"""
+    def fetch_clients(self, force=False):
+        """Fetch clients from the API, reusing a recently fetched list unless forced"""
         logger.debug("Requesting client list from API")
-        self.api_client.fetch_clients()
+        self.api_client.fetch_clients(force=force)
+    
+    def on_refresh_clicked(self):
+        """An explicit refresh always goes to the API"""
+        self.fetch_clients(force=True)
     
     def on_clients_loaded(self, clients):
         """Handle loaded clients"""
         logger.info("Received %d clients from API", len(clients))
-        self.client_combo.clear()
-        self.client_combo.addItem("Select a client", "")
+        log_debug = logger.isEnabledFor(logging.DEBUG)
+        # Collect all rows first so the combo is filled in one batch
+        texts = ["Select a client"]
+        ids = [""]
+        index_by_id = {}
         
         for client in clients:
             # Client is now a dictionary with id, instanceId, lastSeen, etc.
@@ -150,19 +155,38 @@ class ConfigWidget(QWidget):
                 if instance_id:
                     display_text = f"{client_id} ({instance_id})"
                     
-                logger.debug("Adding client: %s", client_id)
-                self.client_combo.addItem(display_text, client_id)
+                if log_debug:
+                    logger.debug("Adding client: %s", client_id)
             elif isinstance(client, str):
                 # Handle legacy format where client is just a string
-                logger.debug("Adding client (legacy format): %s", client)
-                self.client_combo.addItem(client, client)
+                if log_debug:
+                    logger.debug("Adding client (legacy format): %s", client)
+                client_id = display_text = client
+            else:
+                continue
+            index_by_id.setdefault(client_id, len(texts))
+            texts.append(display_text)
+            ids.append(client_id)
+        
+        # Fill the combo without emitting a change signal per item or
+        # repainting in between; the final selection is applied once
+        # signals are back on
+        combo = self.client_combo
+        combo.setUpdatesEnabled(False)
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItems(texts)
+        for index, client_id in enumerate(ids):
+            combo.setItemData(index, client_id)
+        combo.blockSignals(False)
+        combo.setUpdatesEnabled(True)
         
         # Select current client if it exists
         if self.api_client.client_id:
             logger.debug("Setting current client to: %s", self.api_client.client_id)
-            index = self.client_combo.findData(self.api_client.client_id)
-            if index != -1:
-                self.client_combo.setCurrentIndex(index)
+            index = index_by_id.get(self.api_client.client_id)
+            if index is not None:
+                combo.setCurrentIndex(index)
     
     def save_config(self):
         """Save API configuration"""
@@ -1,22 +1,30 @@
 import logging
+import os
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
-    QLabel, QStatusBar, QPushButton, QSplitter, QSizePolicy,
-    QMenuBar, QDialog, QDialogButtonBox, QTextBrowser
+    QLabel, QPushButton, QSizePolicy,
+    QMenuBar, QDialog, QFileDialog
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import QEvent, QMetaObject, Qt, QTimer, pyqtSignal, pyqtSlot
 from PyQt6.QtGui import QAction
 from ui.config_widget import ConfigWidget
 from ui.mapping_widget import MappingWidget
 from ui.midi_monitor_widget import MidiMonitorWidget
 
-from update_checker import CURRENT_VERSION
+from version import VERSION as CURRENT_VERSION
 
 logger = logging.getLogger(__name__)
 
 class AboutDialog(QDialog):
     """About dialog with version information and update check."""
     
+    INFO_HTML = (
+        "<h2>MIDI REST Integration</h2>"
+        f"<p><b>Version:</b> {CURRENT_VERSION}</p>"
+        "<p><b>Author:</b> ThreeHats</p>"
+        "<p>Connect MIDI controllers to Foundry VTT via REST API</p>"
+    )
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
@@ -28,12 +36,7 @@ class AboutDialog(QDialog):
         # App info
         app_info = QLabel()
         app_info.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        app_info.setText(
-            "<h2>MIDI REST Integration</h2>"
-            f"<p><b>Version:</b> {CURRENT_VERSION}</p>"
-            "<p><b>Author:</b> ThreeHats</p>"
-            "<p>Connect MIDI controllers to Foundry VTT via REST API</p>"
-        )
+        app_info.setText(self.INFO_HTML)
         layout.addWidget(app_info)
         
         # Buttons
@@ -45,9 +48,10 @@ class AboutDialog(QDialog):
         
         button_layout.addStretch()
         
-        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok)
-        button_box.accepted.connect(self.accept)
-        button_layout.addWidget(button_box)
+        ok_button = QPushButton("OK")
+        ok_button.setDefault(True)
+        ok_button.clicked.connect(self.accept)
+        button_layout.addWidget(ok_button)
         
         layout.addLayout(button_layout)
         self.setLayout(layout)
@@ -58,13 +62,30 @@ class AboutDialog(QDialog):
             self.parent.check_for_updates()
 
 class MainWindow(QWidget):
+    # Forwarded from the mapping widget, which is only built when its tab
+    # is first shown
+    mapping_changed_signal = pyqtSignal(dict)
+    
+    # Status text changes are applied at most this often; only the most
+    # recent message of each window is shown
+    STATUS_INTERVAL_MS = 50
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self._about_dialog = None  # built on first Help > About
         logger.info("Initializing main window UI")
         self.init_ui()
+        
+        # Import/export run on the config manager's worker thread
+        config_manager = self.parent.config_manager
+        config_manager.import_finished.connect(
+            self.on_config_imported, Qt.ConnectionType.QueuedConnection)
+        config_manager.export_finished.connect(
+            self.on_config_exported, Qt.ConnectionType.QueuedConnection)
     
     def init_ui(self):
+        log_debug = logger.isEnabledFor(logging.DEBUG)
         # Main layout
         main_layout = QVBoxLayout()
         self.setLayout(main_layout)
@@ -73,42 +94,102 @@ class MainWindow(QWidget):
         self.create_menu_bar(main_layout)
         
         # Create tabs
-        logger.debug("Creating UI tabs")
+        if log_debug:
+            logger.debug("Creating UI tabs")
         self.tabs = QTabWidget()
         main_layout.addWidget(self.tabs)
         
         # Create configuration widget
-        logger.debug("Creating configuration widget")
+        if log_debug:
+            logger.debug("Creating configuration widget")
         self.config_widget = ConfigWidget(self.parent.api_client)
         self.tabs.addTab(self.config_widget, "Configuration")
         
-        # Create mapping widget
-        logger.debug("Creating mapping widget")
-        self.mapping_widget = MappingWidget(
-            self.parent.midi_handler,
-            self.parent.api_client
-        )
-        self.tabs.addTab(self.mapping_widget, "MIDI Mappings")
-        
-        # Create MIDI monitor widget with support for parameters
-        logger.debug("Creating MIDI monitor widget")
-        self.midi_monitor = MidiMonitorWidget(self.parent.midi_handler)
-        self.tabs.addTab(self.midi_monitor, "MIDI Monitor")
+        # The other tabs start as placeholders and get their real widget
+        # the first time they are selected, see _ensure_tab
+        self.mapping_widget = None
+        self.midi_monitor = None
+        self._tab_factories = {
+            self.tabs.addTab(QWidget(), "MIDI Mappings"): self._build_mapping_widget,
+            self.tabs.addTab(QWidget(), "MIDI Monitor"): self._build_midi_monitor,
+        }
+        self.tabs.currentChanged.connect(self._ensure_tab)
+        self._preload_scheduled = False
         
         # Status bar
         self.status_layout = QHBoxLayout()
+        # Single line, elided in _flush_status, so a status change never
+        # reflows wrapped text or resizes the layout
         self.status_label = QLabel("Ready")
-        self.status_label.setWordWrap(True)  # Enable word wrapping
         self.status_label.setMinimumHeight(20)  # Ensure minimum height for readability
+        # Its width comes from the layout, never from the (unelided) text
+        self.status_label.setMinimumWidth(1)
         
         # Set size policy to prevent horizontal expansion
         self.status_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
         
         self.status_layout.addWidget(self.status_label)
+        # Re-elide the current message whenever the label's width changes
+        self.status_label.installEventFilter(self)
+        # Latest status text requested, the text last put on the label,
+        # and whether show_status_nonblocking already has a flush on its way
+        self._pending_status = self._shown_status = self.status_label.text()
+        self._status_posted = False
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(self.STATUS_INTERVAL_MS)
+        self._status_timer.timeout.connect(self._flush_status)
         
         # Size the window - set to maximize on startup
         self.resize(1200, 1000)  # Set default size in case maximize doesn't work
-        logger.debug("Main window UI initialized")
+        if log_debug:
+            logger.debug("Main window UI initialized")
+    
+    def _build_mapping_widget(self):
+        logger.debug("Creating mapping widget")
+        app = self.parent
+        self.mapping_widget = MappingWidget(app.midi_handler, app.api_client)
+        self.mapping_widget.mapping_changed_signal.connect(self.mapping_changed_signal)
+        return self.mapping_widget
+    
+    def _build_midi_monitor(self):
+        # Create MIDI monitor widget with support for parameters
+        logger.debug("Creating MIDI monitor widget")
+        self.midi_monitor = MidiMonitorWidget(self.parent.midi_handler)
+        return self.midi_monitor
+    
+    def _ensure_tab(self, index):
+        """Swap a placeholder tab for its real widget, once"""
+        factory = self._tab_factories.pop(index, None)
+        if factory is None:
+            return
+        widget = factory()
+        placeholder = self.tabs.widget(index)
+        title = self.tabs.tabText(index)
+        current = self.tabs.currentIndex()
+        # Removing and re-inserting moves the current tab around; keep
+        # that from re-entering here
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, widget, title)
+        self.tabs.setCurrentIndex(current)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._tab_factories and not self._preload_scheduled:
+            # Build the remaining tabs once the event loop is idle after the
+            # first paint, so the first click on them doesn't stall
+            self._preload_scheduled = True
+            QTimer.singleShot(0, self._preload_next_tab)
+    
+    def _preload_next_tab(self):
+        """Build one placeholder tab, then yield to the event loop before the next"""
+        if self._tab_factories:
+            self._ensure_tab(next(iter(self._tab_factories)))
+        if self._tab_factories:
+            QTimer.singleShot(0, self._preload_next_tab)
     
     def create_menu_bar(self, main_layout):
         """Create menu bar with Help menu."""
@@ -145,46 +226,123 @@ class MainWindow(QWidget):
     
     def show_about(self):
         """Show about dialog."""
-        dialog = AboutDialog(self.parent)
-        dialog.exec()
+        if self._about_dialog is None:
+            self._about_dialog = AboutDialog(self.parent)
+        self._about_dialog.exec()
     
     def show_status(self, message):
         """Show status message"""
+        if message == self._pending_status:
+            return
         logger.info("Status update: %s", message)
-        self.status_label.setText(message)
+        self._pending_status = message
+        self._start_status_timer()
     
+    @pyqtSlot(str)
     def show_status_nonblocking(self, message):
-        """Show status message in a non-blocking way using a timer"""
-        # Use Qt's own event queue to update the UI without blocking the MIDI thread
-        QTimer.singleShot(0, lambda: self.status_label.setText(message))
+        """Show status message in a non-blocking way
+        
+        Safe to call from any thread: it only records the message and, once
+        per status interval, posts a queued call to the GUI thread, so a
+        burst of updates (e.g. one per MIDI event) costs a single label
+        update showing the latest.
+        """
+        if message == self._pending_status:
+            # Repeats (e.g. a held controller) need no label update
+            return
+        self._pending_status = message
+        if not self._status_posted:
+            self._status_posted = True
+            QMetaObject.invokeMethod(self, "_start_status_timer", Qt.ConnectionType.QueuedConnection)
+    
+    @pyqtSlot()
+    def _start_status_timer(self):
+        if not self._status_timer.isActive():
+            self._status_timer.start()
+    
+    def _flush_status(self):
+        # Cleared before reading, so a message recorded after this point
+        # posts a new flush rather than being lost
+        self._status_posted = False
+        text = self._pending_status
+        if text == self._shown_status:
+            return
+        self._shown_status = text
+        self._elide_status()
+    
+    def _elide_status(self):
+        """Fit the shown status message to the label's current width"""
+        label = self.status_label
+        text = self._shown_status
+        width = label.width()
+        if label.isVisible() and width > 0:
+            shown = label.fontMetrics().elidedText(text, Qt.TextElideMode.ElideRight, width)
+        else:
+            # Not laid out yet, so its width means nothing; the resize
+            # when it is shown elides it properly
+            shown = text
+        label.setText(shown)
+        # Long messages (usually errors) stay readable on hover
+        label.setToolTip(text if shown != text else "")
+    
+    def eventFilter(self, obj, event):
+        if obj is self.status_label and event.type() == QEvent.Type.Resize:
+            self._elide_status()
+        return super().eventFilter(obj, event)
     
     def refresh_clients(self):
         """Refresh client list in config widget"""
         logger.debug("Refreshing client list")
         self.config_widget.fetch_clients()
     
+    def _config_dir(self):
+        """Directory the import/export dialogs open in: the last one used"""
+        return self.parent.settings.value("ui/config_dir", "")
+    
+    def _remember_config_dir(self, filename):
+        self.parent.settings.setValue("ui/config_dir", os.path.dirname(filename))
+    
     def import_config(self):
         """Import configuration from file"""
         logger.info("Import config dialog opened")
-        from PyQt6.QtWidgets import QFileDialog
         filename, _ = QFileDialog.getOpenFileName(
-            self, "Import Configuration", "", "JSON Files (*.json)"
+            self, "Import Configuration", self._config_dir(), "JSON Files (*.json)",
+            options=QFileDialog.Option.ReadOnly
         )
         if filename:
+            self._remember_config_dir(filename)
             logger.info("Importing configuration from %s", filename)
-            mappings = self.parent.config_manager.import_config(filename)
-            self.parent.midi_handler.set_mappings(mappings)
+            self.show_status(f"Importing configuration from {filename}...")
+            self.parent.config_manager.import_config_async(filename)
+    
+    def on_config_imported(self, filename, mappings):
+        if mappings is None:
+            # Keep the current mappings rather than replacing them with nothing
+            self.show_status(f"Failed to import configuration from {filename}")
+            return
+        self.parent.midi_handler.set_mappings(mappings)
+        self.parent.save_settings(api=False)
+        if self.mapping_widget is not None:
+            # Otherwise it reads the new mappings when first shown
             self.mapping_widget.refresh_mappings()
-            self.show_status(f"Imported configuration from {filename}")
+        self.show_status(f"Imported configuration from {filename}")
     
     def export_config(self):
         """Export configuration to file"""
         logger.info("Export config dialog opened")
-        from PyQt6.QtWidgets import QFileDialog
         filename, _ = QFileDialog.getSaveFileName(
-            self, "Export Configuration", "", "JSON Files (*.json)"
+            self, "Export Configuration", self._config_dir(), "JSON Files (*.json)"
         )
         if filename:
+            self._remember_config_dir(filename)
             logger.info("Exporting configuration to %s", filename)
-            self.parent.config_manager.export_config(filename)
+            self.show_status(f"Exporting configuration to {filename}...")
+            # Snapshot the live mappings; the worker must not see later edits
+            self.parent.config_manager.export_config_async(
+                filename, dict(self.parent.midi_handler.mappings))
+    
+    def on_config_exported(self, filename, success):
+        if success:
             self.show_status(f"Exported configuration to {filename}")
+        else:
+            self.show_status(f"Failed to export configuration to {filename}")
@@ -3,11 +3,12 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, 
     QLabel, QPushButton, QComboBox, QTableWidget, 
     QTableWidgetItem, QHeaderView, QMessageBox,
-    QSpinBox, QGroupBox, QDialog, QFormLayout
+    QSpinBox, QGroupBox, QDialog, QFormLayout, QCheckBox
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 
 from ui.parameter_dialog import ParameterDialog
+from api_client import Endpoint
 
 logger = logging.getLogger(__name__)
 
@@ -25,17 +26,16 @@ class MappingWidget(QWidget):
         
         # Connect signals
         self.midi_handler.midi_devices_changed.connect(self.update_midi_devices)
-        # Fix: This connection doesn't work for learning mode, we need to listen for raw MIDI messages
-        # self.midi_handler.midi_signal_received.connect(self.on_midi_received)
-        
-        # Fix: Connect to the MIDI listener thread's raw signals instead
-        if self.midi_handler.listener_thread:
-            self.midi_handler.listener_thread.midi_event.connect(self.on_raw_midi_message)
+        # Raw MIDI messages for learn mode are only subscribed to while
+        # learning, see toggle_learn_mode
         
         self.api_client.endpoints_loaded.connect(self.update_endpoints)
         
         self.init_ui()
         self.refresh_mappings()
+        if self.api_client.available_endpoints:
+            # Endpoints fetched before this widget was created
+            self.update_endpoints(self.api_client.available_endpoints)
     
     def init_ui(self):
         # Main layout
@@ -109,6 +109,13 @@ class MappingWidget(QWidget):
         self.add_mapping_button.clicked.connect(self.add_mapping)
         mapping_layout.addWidget(self.add_mapping_button, 2, 1)
         
+        # Opt-in merging of repeated calls (e.g. a knob sweep)
+        self.coalesce_check = QCheckBox("Merge rapid repeats")
+        self.coalesce_check.setToolTip(
+            "Send identical calls from this mapping only once when they arrive "
+            "within a few milliseconds of each other")
+        mapping_layout.addWidget(self.coalesce_check, 2, 2, 1, 2)
+        
         main_layout.addWidget(mapping_group)
         
         # Mappings table
@@ -135,14 +142,14 @@ class MappingWidget(QWidget):
         delete_button_layout.addStretch()
         main_layout.addLayout(delete_button_layout)
         
-        # Initialize with devices
-        self.refresh_midi_devices()
+        # Initialize with devices; the list arrives via midi_devices_changed
+        self.midi_handler.refresh_devices_async()
     
     def refresh_midi_devices(self):
         """Refresh MIDI device list but don't connect automatically"""
         logger.debug("Refreshing MIDI device list")
-        devices = self.midi_handler.refresh_devices()  # Just refresh the list without auto-connecting
-        self.update_midi_devices(devices)
+        # Enumerated in the background; update_midi_devices gets the result
+        self.midi_handler.refresh_devices_async(force=True)
     
     def update_midi_devices(self, devices):
         """Update MIDI device dropdown"""
@@ -173,20 +180,13 @@ class MappingWidget(QWidget):
         self.endpoint_combo.clear()
         
         # Check if we received the full endpoint objects or just paths
-        if endpoints and isinstance(endpoints[0], dict):
+        if endpoints and isinstance(endpoints[0], Endpoint):
             # We have full endpoint info
             for endpoint in endpoints:
-                method = endpoint.get("method", "")
-                path = endpoint.get("path", "")
-                description = endpoint.get("description", "")
-                
-                # Build the display text
-                display = f"{method} {path}"
-                
                 # Add to dropdown with tooltip
-                self.endpoint_combo.addItem(display)
+                self.endpoint_combo.addItem(endpoint.display)
                 index = self.endpoint_combo.count() - 1
-                self.endpoint_combo.setItemData(index, description, Qt.ItemDataRole.ToolTipRole)
+                self.endpoint_combo.setItemData(index, endpoint.description, Qt.ItemDataRole.ToolTipRole)
         else:
             # Just paths (backward compatibility)
             for endpoint in endpoints:
@@ -203,14 +203,6 @@ class MappingWidget(QWidget):
         if self.midi_handler.current_device:
             # Disconnect
             logger.info("Disconnecting from MIDI device: %s", self.midi_handler.current_device)
-            # Fix: Disconnect signal before closing
-            if self.midi_handler.listener_thread:
-                try:
-                    self.midi_handler.listener_thread.midi_event.disconnect(self.on_raw_midi_message)
-                except TypeError:
-                    # Signal wasn't connected
-                    pass
-                    
             self.midi_handler.close()
             self.midi_handler.current_device = None
             self.connect_button.setText("Connect")
@@ -220,9 +212,6 @@ class MappingWidget(QWidget):
             if device:
                 logger.info("Connecting to MIDI device: %s", device)
                 if self.midi_handler.connect_to_device(device):
-                    # Fix: Connect to the new thread's signal
-                    if self.midi_handler.listener_thread:
-                        self.midi_handler.listener_thread.midi_event.connect(self.on_raw_midi_message)
                     self.connect_button.setText("Disconnect")
                 else:
                     logger.error("Failed to connect to MIDI device: %s", device)
@@ -236,9 +225,15 @@ class MappingWidget(QWidget):
             logger.info("MIDI learn mode activated")
             self.learn_button.setText("Listening...")
             self.current_midi_message = None
+            self.midi_handler.midi_message_received.connect(self.on_raw_midi_message)
         else:
             logger.info("MIDI learn mode deactivated")
             self.learn_button.setText("MIDI Learn")
+            try:
+                self.midi_handler.midi_message_received.disconnect(self.on_raw_midi_message)
+            except TypeError:
+                # Signal wasn't connected
+                pass
     
     def on_raw_midi_message(self, message):
         """Handle raw MIDI messages from the device for MIDI learn mode"""
@@ -293,13 +288,9 @@ class MappingWidget(QWidget):
             # Find the selected endpoint in available_endpoints
             selected_text = self.endpoint_combo.currentText()
             for ep in self.api_client.available_endpoints:
-                display = ep.get("display", "")
-                path = ep.get("path", "")
-                method = ep.get("method", "POST")  # Default to POST if not specified
-                
-                if selected_text == display or path == selected_text:
-                    endpoint_path = path
-                    http_method = method
+                if selected_text == ep.display or ep.path == selected_text:
+                    endpoint_path = ep.path
+                    http_method = ep.method or "POST"  # Default to POST if not specified
                     endpoint_data = ep
                     break
         
@@ -333,7 +324,8 @@ class MappingWidget(QWidget):
                    msg_type, channel, note_or_control, full_endpoint)
         self.midi_handler.add_mapping(
             msg_type, channel, note_or_control, 
-            full_endpoint, query_params, body_params, path_params
+            full_endpoint, query_params, body_params, path_params,
+            coalesce=self.coalesce_check.isChecked()
         )
         
         # Refresh display
@@ -366,13 +358,25 @@ class MappingWidget(QWidget):
     
     def refresh_mappings(self):
         """Refresh the mappings table"""
-        logger.debug("Refreshing mappings table with %d mappings", len(self.midi_handler.mappings))
-        self.mappings_table.setRowCount(0)
+        mappings = self.midi_handler.mappings
+        logger.debug("Refreshing mappings table with %d mappings", len(mappings))
+        table = self.mappings_table
+        # Rebuild with painting and item signals off, then show the result
+        # in one pass rather than repainting per inserted row
+        table.setUpdatesEnabled(False)
+        table.blockSignals(True)
+        try:
+            self._fill_mappings_table(table, mappings)
+        finally:
+            table.blockSignals(False)
+            table.setUpdatesEnabled(True)
+    
+    @staticmethod
+    def _fill_mappings_table(table, mappings):
+        table.setRowCount(0)
+        table.setRowCount(len(mappings))
         
-        for (msg_type, channel, note_control), mapping_data in self.midi_handler.mappings.items():
-            row_position = self.mappings_table.rowCount()
-            self.mappings_table.insertRow(row_position)
-            
+        for row_position, ((msg_type, channel, note_control), mapping_data) in enumerate(mappings.items()):
             # Handle both old and new mapping formats
             if isinstance(mapping_data, dict):
                 endpoint = mapping_data.get("endpoint", "")
@@ -388,6 +392,8 @@ class MappingWidget(QWidget):
                     param_indicators.append(f"Q:{len(query_params)}")
                 if body_params:
                     param_indicators.append(f"B:{len(body_params)}")
+                if mapping_data.get("coalesce"):
+                    param_indicators.append("merged")
                     
                 if param_indicators:
                     display_endpoint = f"{endpoint} [{' '.join(param_indicators)}]"
@@ -421,10 +427,10 @@ class MappingWidget(QWidget):
             # Set tooltip for the endpoint cell
             endpoint_item.setToolTip(tooltip)
             
-            self.mappings_table.setItem(row_position, 0, midi_item)
-            self.mappings_table.setItem(row_position, 1, channel_item)
-            self.mappings_table.setItem(row_position, 2, note_control_item)
-            self.mappings_table.setItem(row_position, 3, endpoint_item)
+            table.setItem(row_position, 0, midi_item)
+            table.setItem(row_position, 1, channel_item)
+            table.setItem(row_position, 2, note_control_item)
+            table.setItem(row_position, 3, endpoint_item)
     
     def edit_mapping(self):
         """Edit a mapping, including the ability to change the MIDI note/control"""
@@ -453,12 +459,14 @@ class MappingWidget(QWidget):
             query_params = mapping_data.get("query_params", {})
             body_params = mapping_data.get("body_params", {})
             path_params = mapping_data.get("path_params", {})
+            coalesce = bool(mapping_data.get("coalesce", False))
         else:
             # Legacy format: just the endpoint string
             endpoint = mapping_data
             query_params = {}
             body_params = {}
             path_params = {}
+            coalesce = False
         
         # Extract HTTP method from endpoint if present
         http_method = "POST"  # Default
@@ -492,17 +500,18 @@ class MappingWidget(QWidget):
         endpoint_data = None
         if hasattr(self.api_client, "available_endpoints"):
             for ep in self.api_client.available_endpoints:
-                if ep.get("path", "") == endpoint_path:
+                if ep.path == endpoint_path:
                     endpoint_data = ep
                     break
         
         if not endpoint_data:
             # Create minimal endpoint data
-            endpoint_data = {
-                "path": endpoint_path,
-                "method": http_method,
-                "description": "Endpoint details not available"
-            }
+            endpoint_data = Endpoint(
+                display=f"{http_method} {endpoint_path}",
+                method=http_method,
+                path=endpoint_path,
+                description="Endpoint details not available"
+            )
         
         # Create a dialog to edit MIDI values
         midi_values_dialog = QDialog(self)
@@ -573,7 +582,8 @@ class MappingWidget(QWidget):
             # Create a new mapping with the updated MIDI trigger and parameters
             self.midi_handler.add_mapping(
                 new_msg_type, new_channel, new_note_or_control, 
-                full_endpoint, new_query_params, new_body_params, new_path_params
+                full_endpoint, new_query_params, new_body_params, new_path_params,
+                coalesce=coalesce
             )
             
             # Log the change
@@ -590,5 +600,6 @@ class MappingWidget(QWidget):
             # If canceled, restore the old mapping
             self.midi_handler.add_mapping(
                 orig_msg_type, orig_channel, orig_note_or_control,
-                endpoint, query_params, body_params, path_params
+                endpoint, query_params, body_params, path_params,
+                coalesce=coalesce
             )
@@ -89,8 +89,8 @@ class MidiMonitorWidget(QWidget):
         self.monitor_text.clear()
         self.monitor_text.append("Monitor cleared.\n")
     
-    @pyqtSlot(object, str, dict, dict, dict)
-    def on_midi_signal(self, message, endpoint=None, query_params=None, body_params=None, path_params=None):
+    @pyqtSlot(object, str, str, dict, dict, dict)
+    def on_midi_signal(self, message, method=None, endpoint=None, query_params=None, body_params=None, path_params=None):
         """Handle MIDI signal with parameters"""
         # Apply filters if any are active
         if self.filter_types and message.type not in self.filter_types:
@@ -111,7 +111,7 @@ class MidiMonitorWidget(QWidget):
         
         # Add endpoint and parameter info if available
         if endpoint:
-            msg_text += f" -> API: {endpoint}"
+            msg_text += f" -> API: {f'{method} ' if method else ''}{endpoint}"
             
             # Add parameter details if available
             params_text = []
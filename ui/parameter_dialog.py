@@ -15,7 +15,7 @@ class ParameterDialog(QDialog):
         """Dialog for configuring endpoint parameters
         
         Args:
-            endpoint_data (dict): The endpoint information from API docs
+            endpoint_data (Endpoint): The endpoint information from API docs
             query_params (dict, optional): Existing query parameters
             body_params (dict, optional): Existing body parameters
             path_params (dict, optional): Existing path parameters
@@ -39,9 +39,9 @@ class ParameterDialog(QDialog):
         main_layout = QVBoxLayout(self)
         
         # Add endpoint information
-        method = self.endpoint_data.get("method", "")
-        path = self.endpoint_data.get("path", "")
-        description = self.endpoint_data.get("description", "")
+        method = self.endpoint_data.method
+        path = self.endpoint_data.path
+        description = self.endpoint_data.description
         
         info_group = QGroupBox("Endpoint Information")
         info_layout = QFormLayout()
@@ -63,7 +63,7 @@ class ParameterDialog(QDialog):
         required_form = QFormLayout(required_scroll_content)
         
         # Add standard required parameters (includes path parameters now)
-        required_params = self.endpoint_data.get("required_parameters", [])
+        required_params = self.endpoint_data.required_parameters
         
         if required_params:
             for param in required_params:
@@ -110,7 +110,7 @@ class ParameterDialog(QDialog):
         optional_scroll.setWidgetResizable(True)
         optional_scroll_content = QWidget()
         optional_form = QFormLayout(optional_scroll_content)
-        optional_params = self.endpoint_data.get("optional_parameters", [])
+        optional_params = self.endpoint_data.optional_parameters
         
         if optional_params:
             for param in optional_params: